@@ -21,6 +21,7 @@ class HoudiniHDAMenu(object):
         self.override_parm = self.__get_override_parm()
         self.menu = []
         self.value = None
+        self._overriden_cache = None
 
     def __get_override_parm(self):
         """Get the override parm (if one exists) for the current menu.
@@ -37,12 +38,16 @@ class HoudiniHDAMenu(object):
         Returns:
             (bool): Is the current menu overriden.
         """
-        if self.override_parm:
-            if self.override_parm.eval() == 1:
-                return True
-            else:
-                return False
-        return True
+        if not self.override_parm:
+            return True
+
+        if self._overriden_cache is None:
+            self._overriden_cache = bool(self.override_parm.eval())
+        return self._overriden_cache
+
+    def clear_override_cache(self):
+        """Clear the cached override state so the override parm is evaluated again."""
+        self._overriden_cache = None
 
     def get_menu(self):
         """Get the menu list for the current instance.
@@ -68,6 +73,7 @@ class HoudiniHDAMenu(object):
                 reversed.
             force(:obj:`bool`, optional): Force data to be loaded from SG.
         """
+        self.clear_override_cache()
         selection = self.get_selection(force=force)
         editable = self.node.isEditableInsideLockedHDA()
 
@@ -79,15 +85,15 @@ class HoudiniHDAMenu(object):
             else:
                 data_dicts = [data_dicts[0]]
 
+        # Convert each name/label to a string exactly once
+        pairs = [(str(item.get(name)), str(item.get(label))) for item in data_dicts]
         if reverse:
-            data_dicts = reversed(data_dicts)
+            pairs.reverse()
 
-        self.menu = []
-        for item in data_dicts:
-            self.menu.append(str(item.get(name)))
-            self.menu.append(str(item.get(label)))
+        # Update in place so any list previously returned by get_menu stays current
+        self.menu[:] = [entry for pair in pairs for entry in pair]
 
-        if selection in self.menu[::2]:
+        if selection in {item_name for item_name, _ in pairs}:
             self.set_value(str(selection))
         elif self.menu:
             self.set_value(str(self.menu[0]))
@@ -106,7 +112,7 @@ class HoudiniHDAMenu(object):
         if self.parm:
             selection = self.parm.eval()
         else:
-            logger.warning("Menu {parm} doesn't exist".format(parm=self.parm))
+            logger.warning("Menu %s doesn't exist", self.parm)
             return None
 
         if selection and selection != "None":
@@ -125,6 +131,7 @@ class HoudiniHDAMenu(object):
         Args:
             value: The value to set.
         """
+        self.clear_override_cache()
         self.value = value
         if self.parm.node().isEditableInsideLockedHDA():
             self.parm.set(str(self.value))
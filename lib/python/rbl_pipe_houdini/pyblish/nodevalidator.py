@@ -2,6 +2,7 @@
 
 """Pyblish Houdini Node Validator Tools."""
 
+import functools
 import logging
 import os
 
@@ -17,6 +18,120 @@ from rbl_pipe_houdini.utils import nodes
 
 logger = logging.getLogger(__name__)
 
+# The pyblish plugins shipped with this package, resolved once at import time
+_PLUGIN_PATH = os.path.join(
+    os.path.abspath(__file__).rsplit("/lib/python", 1)[0],
+    "lib/python/rbl_pipe_houdini/pyblish/plugins",
+)
+
+# Pyblish bindings read from each node's PythonModule, keyed by hou.Node.sessionId()
+_hm_cache = {}
+
+# Node plugins registered with pyblish, keyed by (node type name, plugin name)
+_registered_plugins = {}
+
+
+def _ensure_plugin_path_registered():
+    """Register the bundled pyblish plugin path if it isn't already registered."""
+    if _PLUGIN_PATH not in pyblish.api.registered_paths():
+        pyblish.api.register_plugin_path(_PLUGIN_PATH)
+
+
+def _deregister_all():
+    """Deregister every pyblish plugin path and plugin.
+
+    This includes those left behind by other tools, such as the USD publish, so
+    their plugins can't be collected by the node validator.
+    """
+    pyblish.api.deregister_all_paths()
+    pyblish.api.deregister_all_plugins()
+    _registered_plugins.clear()
+
+
+def _has_plugins(entry):
+    """Check if the given PythonModule bindings include any pyblish plugins.
+
+    Args:
+        entry(dict): The PythonModule bindings, as returned by `hm_attributes`.
+
+    Returns:
+        (bool): Are there pyblish plugins to register for the node?
+    """
+    plugins = entry["plugins"]
+    return bool(plugins) and isinstance(plugins, list)
+
+
+def hm_attributes(node):
+    """Get the pyblish bindings from the PythonModule of the given node.
+
+    The PythonModule is only queried once per node, with the result cached until
+    `PyblishNodeValidator.clear_caches` is called.
+
+    Args:
+        node(hou.Node): The Houdini node to query.
+
+    Returns:
+        (dict): The PythonModule itself (`hm`) along with the `validate`, `fix` and
+            `plugins` bindings, or None for any that aren't implemented on the node.
+    """
+    session_id = node.sessionId()
+    entry = _hm_cache.get(session_id)
+    if entry is None:
+        hm = node.hm()
+        entry = {
+            "hm": hm,
+            "validate": getattr(hm, "pyblish_validate", None),
+            "fix": getattr(hm, "pyblish_fix", None),
+            "plugins": getattr(hm, "pyblish_plugins", None),
+        }
+        _hm_cache[session_id] = entry
+
+    return entry
+
+
+@functools.lru_cache(maxsize=None)
+def resolve_node(node_path):
+    """Resolve the Houdini node at the given path and whether it is a HDA.
+
+    The result is cached per node path for the duration of a validation run, see
+    `PyblishNodeValidator.clear_caches`.
+
+    Args:
+        node_path(str): The Houdini node path to resolve.
+
+    Returns:
+        (:obj:`tuple` of hou.Node, bool): The node and whether it is a digital asset.
+    """
+    return (hou.node(node_path), nodes.is_digital_asset(node_path))
+
+
+@functools.lru_cache(maxsize=None)
+def node_type_name(node_path):
+    """Get the (cached) node type name for the given node path.
+
+    Args:
+        node_path(str): The Houdini node path to query.
+
+    Returns:
+        (str): The node type name.
+    """
+    node, _ = resolve_node(node_path)
+    return node.type().name()
+
+
+@functools.lru_cache(maxsize=None)
+def hda_library_path(node_path):
+    """Get the (cached) HDA library file path for the given node path.
+
+    Args:
+        node_path(str): The Houdini node path to query.
+
+    Returns:
+        (str): The library file path of the node's HDA definition.
+    """
+    node, _ = resolve_node(node_path)
+    return node.type().definition().libraryFilePath()
+
 
 class ValidateNode(pyblish.api.InstancePlugin):
     """Pyblish validate node."""
@@ -32,7 +147,7 @@ class ValidateNode(pyblish.api.InstancePlugin):
                 validating.
         """
         for node in instance:
-            self.log.info("Validating {path}.".format(path=node.path()))
+            self.log.info("Validating %s.", node.path())
             self.validate(node)
 
     def validate(self, node):
@@ -61,7 +176,7 @@ class ValidateFixNode(validatewithautofix.ValidateWithAutoFix):
                 validating.
         """
         for node in instance:
-            self.log.info("Validating {path}.".format(path=node.path()))
+            self.log.info("Validating %s.", node.path())
             self.validate(node)
 
     def validate(self, node):
@@ -97,6 +212,14 @@ class PyblishNodeValidator:
 
     all_nodes = {}
 
+    @classmethod
+    def clear_caches(cls):
+        """Clear any node lookups cached during a previous validation run."""
+        _hm_cache.clear()
+        resolve_node.cache_clear()
+        node_type_name.cache_clear()
+        hda_library_path.cache_clear()
+
     def __init__(self, node_list, title="Houdini Node Validator"):
         """Initialise the Node Validator for the given list of Houdini nodes.
 
@@ -107,9 +230,10 @@ class PyblishNodeValidator:
         self.node_list = node_list
         self.title = title
 
-        # Make sure we don't already have plugins loaded from elsewhere
-        pyblish.api.deregister_all_paths()
-        pyblish.api.deregister_all_plugins()
+        self.clear_caches()
+
+        # Make sure we don't have stale plugins left over from a previous run
+        _deregister_all()
 
     @classmethod
     def get_validate_plugins(cls, current_node):
@@ -125,10 +249,9 @@ class PyblishNodeValidator:
             plugins(:obj:`list` of :obj:`str`): A list of pyblish plugins on the node.
         """
         plugins = []
-        if hasattr(current_node.hm(), "pyblish_plugins"):
-            pyblish_plugins = getattr(current_node.hm(), "pyblish_plugins")
-            if isinstance(pyblish_plugins, list):
-                plugins.extend(pyblish_plugins)
+        pyblish_plugins = hm_attributes(current_node)["plugins"]
+        if isinstance(pyblish_plugins, list):
+            plugins.extend(pyblish_plugins)
 
         return plugins
 
@@ -142,11 +265,7 @@ class PyblishNodeValidator:
         Returns:
             (bool): Does the validate function exist?
         """
-        if hasattr(current_node.hm(), "pyblish_validate"):
-            validate = getattr(current_node.hm(), "pyblish_validate")
-            if callable(validate):
-                return True
-        return False
+        return callable(hm_attributes(current_node)["validate"])
 
     @classmethod
     def can_validate(cls, node_list):
@@ -162,15 +281,24 @@ class PyblishNodeValidator:
         Returns:
             (bool): The validation status for the given nodes.
         """
-        for node in node_list:
-            if nodes.is_digital_asset(node.path()):
-                plugins = cls.get_validate_plugins(node)
-                if plugins:
-                    return True
-                if cls.get_simple_validate(node):
-                    return True
+        return any(
+            cls._has_any_validator(node)
+            for node in node_list
+            if resolve_node(node.path())[1]
+        )
+
+    @classmethod
+    def _has_any_validator(cls, current_node):
+        """Determine if the given node has pyblish plugins or a validate function.
 
-        return False
+        Args:
+            current_node(hou.Node): The Houdini node to check.
+
+        Returns:
+            (bool): Does the node implement any validation?
+        """
+        entry = hm_attributes(current_node)
+        return _has_plugins(entry) or callable(entry["validate"])
 
     def generate_node_dict(self):
         """Generate a dictionary of Houdini nodes.
@@ -179,31 +307,43 @@ class PyblishNodeValidator:
         family.
 
         Returns:
-            node_dict(dict): A python dictionary of Houdini node_paths along with any
-                required data including their family.
+            node_dict(dict): A python dictionary of Houdini node_paths mapped to a
+                tuple of the resolved hou.Node and its list of families.
         """
         node_dict = {}
+        to_register = {}
         for node_path in self.node_list:
             family = []
-            node = hou.node(node_path)
+            node, is_hda = resolve_node(node_path)
 
-            if not nodes.is_digital_asset(node_path):
-                logger.info("Skipping {node} - not a HDA.".format(node=node.name()))
+            if not is_hda:
+                logger.info("Skipping %s - not a HDA.", node.name())
                 continue
 
+            # Read the PythonModule bindings once and reuse them for every check
+            entry = hm_attributes(node)
+
             # Get any pyblish plugins stored on the node
-            plugins = self.get_validate_plugins(node)
-            if plugins:
-                family.append(node.type().name())
-                for plugin in plugins:
-                    pyblish.api.register_plugin(getattr(node.hm(), plugin))
+            if _has_plugins(entry):
+                type_name = node_type_name(node_path)
+                family.append(type_name)
+                for plugin in entry["plugins"]:
+                    to_register.setdefault((type_name, plugin), entry["hm"])
 
-            if self.get_simple_validate(node):
+            if callable(entry["validate"]):
                 family.append("simple")
 
             family.append("generic")
 
-            node_dict[node_path] = family
+            node_dict[node_path] = (node, family)
+
+        # Nodes of the same type share their plugins so only register each one once
+        for key, hm in to_register.items():
+            if key in _registered_plugins:
+                continue
+            plugin = getattr(hm, key[1])
+            pyblish.api.register_plugin(plugin)
+            _registered_plugins[key] = plugin
 
         return node_dict
 
@@ -213,6 +353,9 @@ class PyblishNodeValidator:
         Returns:
             (QWidget): The Pyblish UI.
         """
+        # Make sure no stale node lookups leak in from a previous run
+        self.clear_caches()
+
         # Setup the node list to be validated
         PyblishNodeValidator.all_nodes = self.generate_node_dict()
 
@@ -220,9 +363,7 @@ class PyblishNodeValidator:
         pyblish.api.register_host("houdini")
 
         # Register the plugins
-        python_root = os.path.abspath(__file__).rsplit("/lib/python", 1)[0]
-        plugins = "lib/python/rbl_pipe_houdini/pyblish/plugins"
-        pyblish.api.register_plugin_path(os.path.join(python_root, plugins))
+        _ensure_plugin_path_registered()
 
         # Launch the UI
         pyblish_ui = houdinipyblishui.HoudiniPyblishUI(
@@ -2,8 +2,6 @@
 
 """Validate if a Houdini node is published."""
 
-import hou
-
 import pyblish.api
 
 from rbl_pipe_houdini.pyblish import nodevalidator
@@ -24,10 +22,8 @@ class CollectNodes(pyblish.api.ContextPlugin):
         Args:
             context(pyblish.Context): The Houdini node instances we are validating.
         """
-        for node_path in nodevalidator.PyblishNodeValidator.all_nodes:
-            families = nodevalidator.PyblishNodeValidator.all_nodes.get(node_path)
-            node = hou.node(node_path)
-
+        all_nodes = nodevalidator.PyblishNodeValidator.all_nodes
+        for node, families in all_nodes.values():
             # Note - pyblish is horrible. If you don't set a family here it adds
             # the 'default' family automatically, which will be the first in the
             # list and will be used to seperate the collected instances in the
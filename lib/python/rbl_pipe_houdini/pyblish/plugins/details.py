@@ -25,7 +25,4 @@ class NodeDetails(pyblish.api.InstancePlugin):
                 validating.
         """
         for node in instance:
-            self.log.info("Node path: {node_path}.".format(node_path=node.path()))
-            self.log.info(
-                "Node type: {node_type}.".format(node_type=node.type().name())
-            )
+            self.log.info("Node path: %s (type: %s).", node.path(), node.type().name())
@@ -6,7 +6,7 @@ import pyblish.api
 
 from rbl_pipe_core.util import filesystem
 
-from rbl_pipe_houdini.utils import nodes
+from rbl_pipe_houdini.pyblish import nodevalidator
 
 
 class IsPublished(pyblish.api.InstancePlugin):
@@ -27,15 +27,13 @@ class IsPublished(pyblish.api.InstancePlugin):
                 validating.
         """
         for node in instance:
-            if not nodes.is_digital_asset(node.path()):
-                self.log.info("Skipping {node} - not a HDA.".format(node=node.name()))
+            _, is_hda = nodevalidator.resolve_node(node.path())
+            if not is_hda:
+                self.log.info("Skipping %s - not a HDA.", node.name())
                 continue
 
-            path = node.type().definition().libraryFilePath()
+            path = nodevalidator.hda_library_path(node.path())
             if not filesystem.is_released(path):
                 self.log.warning(
-                    "Using HDA definition from non-standard \
-                location: {path}".format(
-                        path=path
-                    )
+                    "Using HDA definition from non-standard location: %s", path
                 )
@@ -6,6 +6,8 @@ import pyblish.api
 
 from rbl_pipe_core.pyblish import validatewithautofix
 
+from rbl_pipe_houdini.pyblish import nodevalidator
+
 
 class SimpleNodeValidator(validatewithautofix.ValidateWithAutoFix):
     """Pyblish plugin to provide a simple HDA validation.
@@ -28,15 +30,12 @@ class SimpleNodeValidator(validatewithautofix.ValidateWithAutoFix):
         for node in instance:
             if not self.has_validate_method(node):
                 self.log.info(
-                    "Skipping - no validate function exists for {node}.".format(
-                        node=node.type().name()
-                    )
+                    "Skipping - no validate function exists for %s.",
+                    node.type().name(),
                 )
                 continue
-            node.hm().pyblish_validate(node)
-            self.log.info(
-                "Simple Node Validator succeeded for {node}".format(node=node.path())
-            )
+            nodevalidator.hm_attributes(node)["validate"](node)
+            self.log.info("Simple Node Validator succeeded for %s", node.path())
 
     @staticmethod
     def has_validate_method(node):
@@ -48,11 +47,7 @@ class SimpleNodeValidator(validatewithautofix.ValidateWithAutoFix):
         Returns:
             (bool): Does the validate function exist?
         """
-        if hasattr(node.hm(), "pyblish_validate"):
-            validate = getattr(node.hm(), "pyblish_validate")
-            if callable(validate):
-                return True
-        return False
+        return callable(nodevalidator.hm_attributes(node)["validate"])
 
     @classmethod
     def auto_fix(cls, instance, action):
@@ -68,12 +63,11 @@ class SimpleNodeValidator(validatewithautofix.ValidateWithAutoFix):
         for node in instance:
             if not cls.has_fix_method(node):
                 action.log.info(
-                    "Skipping - no fix function exists for {node}.".format(
-                        node=node.type().name()
-                    )
+                    "Skipping - no fix function exists for %s.",
+                    node.type().name(),
                 )
                 continue
-            node.hm().pyblish_fix(node)
+            nodevalidator.hm_attributes(node)["fix"](node)
 
     @staticmethod
     def has_fix_method(node):
@@ -85,8 +79,4 @@ class SimpleNodeValidator(validatewithautofix.ValidateWithAutoFix):
         Returns:
             (bool): Does the fix function exist.
         """
-        if hasattr(node.hm(), "pyblish_fix"):
-            fix = getattr(node.hm(), "pyblish_fix")
-            if callable(fix):
-                return True
-        return False
+        return callable(nodevalidator.hm_attributes(node)["fix"])
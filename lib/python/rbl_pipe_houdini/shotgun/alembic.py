@@ -5,8 +5,6 @@
 import logging
 import os
 
-from rbl_pipe_core.util import farm
-
 from rbl_pipe_houdini.shotgun import node
 
 
@@ -16,6 +14,12 @@ logger = logging.getLogger(__name__)
 class ShotgunAlembicNode(node.ShotgunNode):
     """Load Alembics from Shotgun."""
 
+    __slots__ = (
+        "node_name",
+        "_resolved_fields",
+        "_last_data_key",
+    )
+
     def __init__(self, current_node):
         """Initialise the class with the given node.
 
@@ -23,19 +27,20 @@ class ShotgunAlembicNode(node.ShotgunNode):
             current_node(hou.Node): The Houdini node to initialise the class with.
         """
         self.node_name = None
+        self._resolved_fields = {}
+        self._last_data_key = None
         super(ShotgunAlembicNode, self).__init__(current_node)
-        logger.info(
-            "ShotgunAlembicNode intitalised for {current_node}".format(
-                current_node=self.current_node,
-            )
-        )
+        logger.info("ShotgunAlembicNode intitalised for %s", self.current_node)
 
     def menus_updated(self):
         """Menus updated callback."""
+        # The menu data has been reloaded so resolve the SG names again
+        self._resolved_fields.clear()
+        self._last_data_key = None
         self.update_path()
 
         # If the UI is loaded update the node name if required
-        if not farm.running_on_farm():
+        if not node.running_on_farm():
             self.update_node_name()
 
     def get_template(self):
@@ -59,15 +64,11 @@ class ShotgunAlembicNode(node.ShotgunNode):
         Returns:
             str: The Alembic file path for the current node.
         """
-        if not farm.running_on_farm():
+        if not node.running_on_farm():
             self.update_path()
 
         if self.current_node.userData("file_path"):
-            logger.info(
-                "Using cached alembic path for {current_node}".format(
-                    current_node=self.current_node,
-                )
-            )
+            logger.info("Using cached alembic path for %s", self.current_node)
             return self.current_node.userData("file_path")
 
         return ""
@@ -81,7 +82,7 @@ class ShotgunAlembicNode(node.ShotgunNode):
         Raises:
             RuntimeError: The node must either be in asset mode or shot mode.
         """
-        if farm.running_on_farm() and self.current_node.userData("file_path"):
+        if node.running_on_farm() and self.current_node.userData("file_path"):
             return self.current_node.userData("file_path")
 
         if self.in_asset_mode():
@@ -92,6 +93,13 @@ class ShotgunAlembicNode(node.ShotgunNode):
             raise RuntimeError("Invalid mode. Must be either asset or shot.")
 
         if data:
+            # Skip the template evaluation if nothing has changed since last time
+            data_key = (self.selected_template(), tuple(sorted(data.items())))
+            if data_key == self._last_data_key and self.current_node.userData(
+                "file_path"
+            ):
+                return
+
             template = self.get_template()
             missing_keys = template.missing_keys(data)
             if missing_keys:
@@ -108,30 +116,27 @@ class ShotgunAlembicNode(node.ShotgunNode):
                 # Set the node name and filepath
                 self.node_name = os.path.splitext(abc_name)[0]
                 self.current_node.setUserData("file_path", file_path)
-                logger.info(
-                    "{current_node} path updated to {path}.".format(
-                        current_node=self.current_node,
-                        path=file_path,
-                    )
-                )
+                self._last_data_key = data_key
+                logger.info("%s path updated to %s.", self.current_node, file_path)
                 return
 
         # Unset the node name and filepath
+        self._last_data_key = None
         self.current_node.setUserData("file_path", "")
         self.node_name = "alembicimport"
-        logger.info(
-            "Path reset for {current_node}".format(
-                current_node=self.current_node,
-            )
-        )
+        logger.info("Path reset for %s", self.current_node)
 
     def update_node_name(self):
         """Update the node name for the current node."""
-        if (
-            self.node_name
-            and self.node_name != self.current_node.name()
-            and self.current_node.evalParm("mode") == 0
-        ):
+        if not self.node_name:
+            return
+
+        # Compare the names first so the mode parm is only evaluated on a rename
+        current_name = self.current_node.name()
+        if self.node_name == current_name:
+            return
+
+        if self.current_node.evalParm("mode") == 0:
             self.current_node.setName(self.node_name, unique_name=True)
 
     def generate_asset_data(self):
@@ -148,9 +153,10 @@ class ShotgunAlembicNode(node.ShotgunNode):
         task_id = self.get_menu("task").get_selection()
 
         if asset_type and asset_id and task_id and self.sg_load.assets:
-            step = self.sg_load.step_from_task(int(task_id))
-            asset = self.sg_load.asset_name_from_id(int(asset_id))
-            variant_name = self.sg_load.variant_name_from_task(int(task_id))
+            step, asset, variant_name = self._resolve_asset_fields(
+                int(asset_id),
+                int(task_id),
+            )
             version = self.get_version()
 
             if version == "latest":
@@ -179,13 +185,12 @@ class ShotgunAlembicNode(node.ShotgunNode):
         task_id = self.get_menu("shot_task").get_selection()
 
         if shot_id and step_id and task_id and self.sg_load.shots:
-            sequence_name = self.sg_load.sequence_name_from_shot_id(int(shot_id))
-            shot_name = self.sg_load.shot_name_from_id(int(shot_id))
-            step_name = self.sg_load.step_name_from_id(
-                int(step_id),
-                shot_id=int(shot_id),
-            )
-            variant_name = self.sg_load.variant_name_from_task(int(task_id))
+            (
+                sequence_name,
+                shot_name,
+                step_name,
+                variant_name,
+            ) = self._resolve_shot_fields(int(shot_id), int(step_id), int(task_id))
             version = self.get_version()
 
             if version == "latest":
@@ -202,6 +207,52 @@ class ShotgunAlembicNode(node.ShotgunNode):
 
         return {}
 
+    def _resolve_asset_fields(self, asset_id, task_id):
+        """Resolve the SG names required to evaluate an asset template.
+
+        The result is cached per ID until the menus are next updated.
+
+        Args:
+            asset_id(int): The SG asset ID.
+            task_id(int): The SG task ID.
+
+        Returns:
+            (tuple): The step, asset name and variant name.
+        """
+        key = ("asset", asset_id, task_id)
+        if key not in self._resolved_fields:
+            self._resolved_fields[key] = (
+                self.sg_load.step_from_task(task_id),
+                self.sg_load.asset_name_from_id(asset_id),
+                self.sg_load.variant_name_from_task(task_id),
+            )
+
+        return self._resolved_fields[key]
+
+    def _resolve_shot_fields(self, shot_id, step_id, task_id):
+        """Resolve the SG names required to evaluate a shot template.
+
+        The result is cached per ID until the menus are next updated.
+
+        Args:
+            shot_id(int): The SG shot ID.
+            step_id(int): The SG step ID.
+            task_id(int): The SG task ID.
+
+        Returns:
+            (tuple): The sequence name, shot name, step name and variant name.
+        """
+        key = ("shot", shot_id, step_id, task_id)
+        if key not in self._resolved_fields:
+            self._resolved_fields[key] = (
+                self.sg_load.sequence_name_from_shot_id(shot_id),
+                self.sg_load.shot_name_from_id(shot_id),
+                self.sg_load.step_name_from_id(step_id, shot_id=shot_id),
+                self.sg_load.variant_name_from_task(task_id),
+            )
+
+        return self._resolved_fields[key]
+
     def is_camera(self):
         """Determine if the node is being used to load a camera.
 
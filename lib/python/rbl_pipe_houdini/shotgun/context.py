@@ -6,10 +6,7 @@ import logging
 
 import hou
 
-from rbl_pipe_houdini.utils import nodes
-
-from rbl_pipe_sg import load
-from rbl_pipe_sg import template
+from rbl_pipe_houdini.shotgun import sgcache
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +14,51 @@ logger = logging.getLogger(__name__)
 class HoudiniSGContext(object):
     """Class to handle the Houdini scene context."""
 
+    __slots__ = (
+        "sg_node",
+        "sg_load",
+        "globals_node",
+        "_parms",
+        "_globals_parms",
+        "_sg_script",
+        "_sg_key",
+        "_sg_template",
+        "_cache",
+        "_cache_hip_path",
+        "_sg_cache",
+    )
+
+    # The context methods that can be looked up by parm name
+    _CONTEXT_METHODS = frozenset(
+        (
+            "template",
+            "asset_type",
+            "asset",
+            "step",
+            "task",
+            "sequence",
+            "shot",
+            "shot_step",
+            "shot_task",
+        )
+    )
+
+    # The parms the context is derived from, on the SG node and the globals node
+    _NODE_CONTEXT_PARMS = frozenset(("override_custom_taskid", "custom_taskid", "mode"))
+    _GLOBALS_CONTEXT_PARMS = frozenset(("context", "task", "asset", "shot"))
+
+    # The SG node events the context watches, see _on_dirty
+    _NODE_EVENTS = (
+        hou.nodeEventType.ParmTupleChanged,
+        hou.nodeEventType.BeingDeleted,
+    )
+
+    # The globals node events that invalidate the cached context
+    _GLOBALS_EVENTS = (
+        hou.nodeEventType.ParmTupleChanged,
+        hou.nodeEventType.BeingDeleted,
+    )
+
     def __init__(self, sg_node, sg_script, sg_key):
         """Initialise the context.
 
@@ -27,15 +69,79 @@ class HoudiniSGContext(object):
             sg_key(str): The SG key to use.
         """
         self.sg_node = sg_node
-        self.sg_load = load.ShotgunLoad.get_instance(
-            sg_script,
-            sg_key,
-        )
-        self.sg_template = template.SGTemplate(
-            sg_script,
-            sg_key,
-        )
+        current_node = sg_node.current_node
+        self._parms = {
+            "override": current_node.parm("override_custom_taskid"),
+            "custom_taskid": current_node.parm("custom_taskid"),
+            "mode": current_node.parm("mode"),
+        }
+        self.sg_load = sgcache.get_sg_load(sg_script, sg_key)
+        self._sg_script = sg_script
+        self._sg_key = sg_key
+        self._sg_template = None
         self.globals_node = self.get_globals_node()
+        self._globals_parms = self.__get_globals_parms()
+        self._cache = {}
+        self._cache_hip_path = hou.hipFile.path()
+        self._sg_cache = {}
+
+        # Drop the cached context whenever one of the parms it is derived from changes
+        current_node.addEventCallback(self._NODE_EVENTS, self._on_dirty)
+        self.__add_globals_callback()
+
+    @property
+    def sg_template(self):
+        """Get the SG template instance, creating it on first use.
+
+        Returns:
+            (rbl_pipe_sg.template.SGTemplate): The SG template instance.
+        """
+        if self._sg_template is None:
+            self._sg_template = sgcache.get_sg_template(self._sg_script, self._sg_key)
+
+        return self._sg_template
+
+    def invalidate(self):
+        """Clear the cached context lookups so they are evaluated again on next access.
+
+        Should be called whenever the context may have changed, eg. the mode or custom
+        task ID has been changed on the node, or a new hip file has been loaded.
+        """
+        self._cache.clear()
+
+    def __check_hip_path(self):
+        """Clear the cached context lookups if the hip file path has changed.
+
+        The hip path is part of the context, so eg. a Save As into another task
+        changes the context.
+        """
+        hip_path = hou.hipFile.path()
+        if hip_path != self._cache_hip_path:
+            self._cache.clear()
+            self._cache_hip_path = hip_path
+
+    def refresh(self):
+        """Clear all cached context lookups, including the cached SG query results."""
+        self._cache.clear()
+        self._sg_cache.clear()
+
+    def _sg_lookup(self, method_name, *args, **kwargs):
+        """Call the given ShotgunLoad method, caching the result on this context.
+
+        Args:
+            method_name(str): The name of the ShotgunLoad method to call.
+            *args: Positional arguments to pass to the method.
+            **kwargs: Keyword arguments to pass to the method.
+
+        Returns:
+            The (cached) result of the ShotgunLoad method.
+        """
+        key = (method_name, args, tuple(sorted(kwargs.items())))
+        if key not in self._sg_cache:
+            method = getattr(self.sg_load, method_name)
+            self._sg_cache[key] = method(*args, **kwargs)
+
+        return self._sg_cache[key]
 
     def get_globals_node(self):
         """Get the globals node from the current scene.
@@ -43,10 +149,14 @@ class HoudiniSGContext(object):
         Returns:
             globals_node(hou.Node): The globals node found in the current scene.
         """
-        globals_node = nodes.all_nodes_of_type(
-            "global",
-            node_filter=hou.nodeTypeFilter.Obj,
-        )
+        # Query the node types' instances directly rather than walking the scene. The
+        # globals HDA may be namespaced and versioned, so match on the short type name.
+        globals_node = [
+            instance
+            for node_type in hou.objNodeTypeCategory().nodeTypes().values()
+            if node_type.nameComponents()[2] == "global"
+            for instance in node_type.instances()
+        ]
 
         if len(globals_node) == 0:
             logger.info(
@@ -64,17 +174,125 @@ class HoudiniSGContext(object):
 
         return globals_node
 
+    def invalidate_globals(self):
+        """Look up the globals node again, eg. after a new scene has been loaded."""
+        self.__set_globals_node(self.get_globals_node())
+
+    def __set_globals_node(self, globals_node):
+        """Switch the context over to the given globals node.
+
+        Args:
+            globals_node(hou.Node): The globals node, or None if there isn't one.
+        """
+        self.__remove_globals_callback()
+        self.globals_node = globals_node
+        self._globals_parms = self.__get_globals_parms()
+        self.__add_globals_callback()
+        self._cache.clear()
+
+    def __check_globals_node(self):
+        """Make sure the globals node is still the one in the scene.
+
+        The globals node may have been deleted, or one added, since it was looked up.
+        """
+        if self.globals_node is not None:
+            try:
+                self.globals_node.path()
+                return
+            except hou.ObjectWasDeleted:
+                logger.debug("Globals node was deleted, looking it up again.")
+                self.globals_node = None
+
+        globals_node = self.get_globals_node()
+        if globals_node is not None or self._globals_parms:
+            self.__set_globals_node(globals_node)
+
+    def __add_globals_callback(self):
+        """Watch the globals node (if there is one) for context parm changes.
+
+        The cached context is also dropped if the globals node is deleted.
+        """
+        if self.globals_node:
+            self.globals_node.addEventCallback(self._GLOBALS_EVENTS, self._on_dirty)
+
+    def __remove_globals_callback(self):
+        """Stop watching the current globals node for context parm changes."""
+        if not self.globals_node:
+            return
+
+        try:
+            self.globals_node.removeEventCallback(self._GLOBALS_EVENTS, self._on_dirty)
+        except (hou.ObjectWasDeleted, hou.OperationFailed):
+            logger.debug("Globals node callback already removed.")
+
+    def remove_callbacks(self):
+        """Remove the node event callbacks added by this context.
+
+        Should be called when the context is replaced, so the old context stops
+        watching the SG node and the shared globals node.
+        """
+        try:
+            self.sg_node.current_node.removeEventCallback(
+                self._NODE_EVENTS, self._on_dirty
+            )
+        except (hou.ObjectWasDeleted, hou.OperationFailed):
+            logger.debug("SG node callback already removed.")
+
+        self.__remove_globals_callback()
+
+    def _on_dirty(self, **kwargs):
+        """Clear the cached context when a parm it is derived from changes.
+
+        Args:
+            **kwargs: The Houdini node event callback arguments.
+        """
+        node = kwargs.get("node")
+        if kwargs.get("event_type") == hou.nodeEventType.BeingDeleted:
+            # The globals node outlives the SG node, so stop watching it once the
+            # SG node is deleted
+            if node != self.globals_node:
+                self.__remove_globals_callback()
+            self._cache.clear()
+            return
+
+        parm_tuple = kwargs.get("parm_tuple")
+        if parm_tuple is not None:
+            if node == self.globals_node:
+                watched = self._GLOBALS_CONTEXT_PARMS
+            else:
+                watched = self._NODE_CONTEXT_PARMS
+            if parm_tuple.name() not in watched:
+                return
+
+        self._cache.clear()
+
+    def __get_globals_parms(self):
+        """Resolve the context parms on the globals node.
+
+        Returns:
+            (dict): The globals node parms keyed by name, empty if there is no globals
+                node.
+        """
+        if not self.globals_node:
+            return {}
+
+        return {
+            name: self.globals_node.parm(name) for name in self._GLOBALS_CONTEXT_PARMS
+        }
+
     def task_id_from_custom(self):
         """Lookup the task ID from the override on the SG node.
 
         Returns:
             custom_taskid(int): The custom task ID read from the node.
         """
-        try:
-            if self.sg_node.current_node.evalParm("override_custom_taskid"):
-                return int(self.sg_node.current_node.evalParm("custom_taskid"))
-        except hou.OperationFailed:
-            logger.debug("Cannot parse custom parm value.")
+        override_parm = self._parms["override"]
+        custom_taskid_parm = self._parms["custom_taskid"]
+        if override_parm is None or custom_taskid_parm is None:
+            return None
+
+        if override_parm.eval():
+            return int(custom_taskid_parm.eval())
 
         return None
 
@@ -84,21 +302,25 @@ class HoudiniSGContext(object):
         Returns:
             (int): The task ID as read from the globals node.
         """
-        if not self.get_globals_node():
+        self.__check_globals_node()
+        if not self.globals_node:
             return None
 
-        context = self.globals_node.evalParm("context")
-        task_name = self.globals_node.evalParm("task")
+        parms = self._globals_parms
+        context = parms["context"].eval()
+        asset_id = None
+        shot_id = None
         if context == "asset":
-            asset_name = self.globals_node.evalParm("asset")
-            asset_id = self.sg_load.asset_id_from_name(asset_name)
+            asset_id = self._sg_lookup("asset_id_from_name", parms["asset"].eval())
         elif context == "shot":
-            shot_name = self.globals_node.evalParm("shot")
-            shot_id = self.sg_load.shot_id_from_name(shot_name)
+            shot_id = self._sg_lookup("shot_id_from_name", parms["shot"].eval())
         else:
             return None
 
-        return self.sg_load.task_id_from_name(
+        task_name = parms["task"].eval()
+
+        return self._sg_lookup(
+            "task_id_from_name",
             task_name,
             asset_id=asset_id,
             shot_id=shot_id,
@@ -113,19 +335,48 @@ class HoudiniSGContext(object):
         path = hou.hipFile.path()
         return self.sg_template.task_id_from_path(path)
 
+    def task_id_probe(self):
+        """Get the task IDs from the custom override, scene globals and hip file.
+
+        The result is cached until the context is invalidated or the hip file path
+        changes.
+
+        Returns:
+            (tuple): The custom, globals and hip task IDs.
+        """
+        self.__check_hip_path()
+        if "task_id_probe" in self._cache:
+            return self._cache["task_id_probe"]
+
+        probe = (
+            self.task_id_from_custom(),
+            self.task_id_from_globals(),
+            self.task_id_from_hip(),
+        )
+        self._cache["task_id_probe"] = probe
+        return probe
+
     def raw_task_id(self):
         """Get the task ID from custom / scene globals / hip file.
 
         Returns:
             (int): The current context task ID.
         """
-        custom_task_id = self.task_id_from_custom()
-        if custom_task_id:
-            return custom_task_id
-        elif self.globals_node:
-            return self.task_id_from_globals()
-        else:
-            return self.task_id_from_hip()
+        self.__check_hip_path()
+        if "raw_task_id" in self._cache:
+            return self._cache["raw_task_id"]
+
+        self.__check_globals_node()
+
+        task_id = self.task_id_from_custom()
+        if not task_id:
+            if self.globals_node:
+                task_id = self.task_id_from_globals()
+            else:
+                task_id = self.task_id_from_hip()
+
+        self._cache["raw_task_id"] = task_id
+        return task_id
 
     def is_asset_context(self):
         """Check if the current context is an asset.
@@ -133,8 +384,14 @@ class HoudiniSGContext(object):
         Returns:
             (bool): In asset context.
         """
-        task_id = self.raw_task_id()
-        return self.sg_load.is_asset_task_id(task_id)
+        self.__check_hip_path()
+        if "is_asset_context" not in self._cache:
+            task_id = self.raw_task_id()
+            self._cache["is_asset_context"] = self._sg_lookup(
+                "is_asset_task_id", task_id
+            )
+
+        return self._cache["is_asset_context"]
 
     def is_shot_context(self):
         """Check if the current context is an shot.
@@ -142,8 +399,12 @@ class HoudiniSGContext(object):
         Returns:
             (bool): In shot context.
         """
-        task_id = self.raw_task_id()
-        return self.sg_load.is_shot_task_id(task_id)
+        self.__check_hip_path()
+        if "is_shot_context" not in self._cache:
+            task_id = self.raw_task_id()
+            self._cache["is_shot_context"] = self._sg_lookup("is_shot_task_id", task_id)
+
+        return self._cache["is_shot_context"]
 
     def template(self):
         """Lookup the template from the context.
@@ -159,15 +420,78 @@ class HoudiniSGContext(object):
         logger.warning("Should either be in asset or shot context.")
         return None
 
+    def _resolve_context_bundle(self):
+        """Resolve the SG entities for the current context task in a single pass.
+
+        The result is cached until the context is invalidated or the hip path changes.
+
+        Returns:
+            (dict): The asset ID, asset type and step ID when in an asset context, or
+                the shot ID, sequence and shot step ID when in a shot context. Any
+                fields that don't apply to the current context are None.
+        """
+        self.__check_hip_path()
+        if "bundle" in self._cache:
+            return self._cache["bundle"]
+
+        bundle = dict.fromkeys(
+            (
+                "asset_id",
+                "asset_type",
+                "step_id",
+                "shot_id",
+                "sequence",
+                "shot_step_id",
+            )
+        )
+
+        task_id = self.raw_task_id()
+        if task_id and self.is_asset_context():
+            asset_id = self._sg_lookup("asset_id_from_task_id", task_id)
+            bundle["asset_id"] = asset_id
+            if asset_id:
+                asset = self._sg_lookup("asset_name_from_id", asset_id)
+                bundle["asset_type"] = self._sg_lookup("asset_type_from_name", asset)
+                bundle["step_id"] = self._step_id_from_task(
+                    task_id, asset_id=asset_id
+                )
+        elif task_id and self.is_shot_context():
+            shot_id = self._sg_lookup("shot_id_from_task_id", task_id)
+            bundle["shot_id"] = shot_id
+            if shot_id:
+                bundle["sequence"] = self._sg_lookup(
+                    "sequence_name_from_shot_id", shot_id
+                )
+                bundle["shot_step_id"] = self._step_id_from_task(
+                    task_id, shot_id=shot_id
+                )
+
+        self._cache["bundle"] = bundle
+        return bundle
+
+    def _step_id_from_task(self, task_id, **entity):
+        """Resolve the step ID for the given task.
+
+        Args:
+            task_id(int): The SG task ID.
+            **entity: The `asset_id` or `shot_id` the task belongs to.
+
+        Returns:
+            (int): The step ID, or None if the task has no step.
+        """
+        step = self._sg_lookup("step_from_task", task_id)
+        if not step:
+            return None
+
+        return self._sg_lookup("step_id_from_name", step, **entity)
+
     def asset_type(self):
         """Lookup the asset type from the context.
 
         Returns:
             (str): The context asset type.
         """
-        asset_id = self.asset()
-        asset = self.sg_load.asset_name_from_id(asset_id)
-        return self.sg_load.asset_type_from_name(asset)
+        return self._resolve_context_bundle()["asset_type"]
 
     def asset(self):
         """Lookup the asset from the context.
@@ -175,8 +499,7 @@ class HoudiniSGContext(object):
         Returns:
             (int): The context asset.
         """
-        task_id = self.task()
-        return self.sg_load.asset_id_from_task_id(task_id)
+        return self._resolve_context_bundle()["asset_id"]
 
     def step(self):
         """Lookup the step from the context.
@@ -184,19 +507,7 @@ class HoudiniSGContext(object):
         Returns:
             (int): The context step.
         """
-        task_id = self.task()
-        if not task_id:
-            return None
-
-        asset_id = self.asset()
-        if not asset_id:
-            return None
-
-        step = self.sg_load.step_from_task(task_id)
-        if not step:
-            return None
-
-        return self.sg_load.step_id_from_name(step, asset_id=asset_id)
+        return self._resolve_context_bundle()["step_id"]
 
     def task(self):
         """Lookup the task from the context.
@@ -214,8 +525,7 @@ class HoudiniSGContext(object):
         Returns:
             (str): The context sequence.
         """
-        shot_id = self.shot()
-        return self.sg_load.sequence_name_from_shot_id(shot_id)
+        return self._resolve_context_bundle()["sequence"]
 
     def shot(self):
         """Lookup the shot from the context.
@@ -223,8 +533,7 @@ class HoudiniSGContext(object):
         Returns:
             (int): The context shot.
         """
-        task_id = self.shot_task()
-        return self.sg_load.shot_id_from_task_id(task_id)
+        return self._resolve_context_bundle()["shot_id"]
 
     def shot_step(self):
         """Lookup the shot step from the context.
@@ -232,19 +541,7 @@ class HoudiniSGContext(object):
         Returns:
             (int): The contexct shot step.
         """
-        task_id = self.shot_task()
-        if not task_id:
-            return None
-
-        shot_id = self.shot()
-        if not shot_id:
-            return None
-
-        step = self.sg_load.step_from_task(task_id)
-        if not step:
-            return None
-
-        return self.sg_load.step_id_from_name(step, shot_id=shot_id)
+        return self._resolve_context_bundle()["shot_step_id"]
 
     def shot_task(self):
         """Lookup the shot task from the context.
@@ -259,20 +556,27 @@ class HoudiniSGContext(object):
     def parm_value_from_context(self, parm_name):
         """Lookup the value for a parameter from the context.
 
+        The value is cached until the context is invalidated, as the SG menus look it
+        up every time their selection is read.
+
         Args:
             parm_name(str): The parm name to look up.
 
         Returns:
             The parameter value.
         """
-        method = getattr(self, parm_name, None)
-        if not method:
+        if parm_name not in self._CONTEXT_METHODS:
             logger.warning(
                 "No context method found for {parm_name}".format(parm_name=parm_name)
             )
             return None
 
-        return method()
+        self.__check_hip_path()
+        key = ("parm_value", parm_name)
+        if key not in self._cache:
+            self._cache[key] = getattr(self, parm_name)()
+
+        return self._cache[key]
 
     def legacy_auto_mode(self):
         """Check if the node is in auto mode.
@@ -283,7 +587,7 @@ class HoudiniSGContext(object):
         Returns:
             (bool): In legacy auto mode?
         """
-        mode_parm = self.sg_node.current_node.parm("mode")
+        mode_parm = self._parms["mode"]
         if mode_parm and mode_parm.evalAsString() == "auto":
             return True
 
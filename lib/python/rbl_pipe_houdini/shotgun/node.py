@@ -2,6 +2,7 @@
 
 """Class that handles supporting SG menus on Houdini HDAs."""
 
+import functools
 import logging
 
 import hou
@@ -9,23 +10,218 @@ import hou
 from rbl_pipe_core.util import farm
 
 from rbl_pipe_houdini.shotgun import context
+from rbl_pipe_houdini.shotgun import sgcache
 from rbl_pipe_houdini.shotgun import sgmenu
 from rbl_pipe_houdini.utils import get_config
 
-from rbl_pipe_sg import load
-from rbl_pipe_sg import template
-
 
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=1)
+def running_on_farm():
+    """Check if we are running on the farm.
+
+    The result is cached for the lifetime of the process, as the farm status cannot
+    change mid-session.
+
+    Returns:
+        (bool): Are we running on the farm?
+    """
+    return farm.running_on_farm()
+
+
+def _read_templates(templates):
+    """Normalise a template definition read from a HDA PythonModule.
+
+    Args:
+        templates: The template definition. Either a template name, a list of template
+            names or a list of template dictionaries.
+
+    Returns:
+        (tuple): The tuple of template names and the tuple of template dictionaries
+            (only populated if the templates were defined as dictionaries).
+    """
+    if not templates:
+        return (), ()
+
+    if isinstance(templates, list) and all(isinstance(n, dict) for n in templates):
+        return tuple(template.get("usd") for template in templates), tuple(templates)
+    elif isinstance(templates, list):
+        return tuple(templates), ()
+
+    return (templates,), ()
+
+
+def _index_templates(templates):
+    """Index a list of template dictionaries by their base (usd) template.
+
+    Args:
+        templates(list): The template dictionaries to index.
+
+    Returns:
+        (dict): The template dictionaries keyed by their usd template. The first
+            definition wins if a usd template is listed more than once.
+    """
+    index = dict()
+    for template_item in templates:
+        index.setdefault(template_item.get("usd"), template_item)
+
+    return index
+
+
+@functools.lru_cache(maxsize=128)
+def templates_for_type(type_name):
+    """Load the templates defined on the PythonModule of the given HDA type.
+
+    The templates are static HDA metadata, so they are only read once per node type.
+
+    Args:
+        type_name(str): The node type name including its category.
+
+    Returns:
+        (tuple): The asset template names, shot template names, asset template
+            dictionaries, shot template dictionaries and the template menu entries.
+
+    Raises:
+        NodeError: Template missing from the node type's houdini module.
+    """
+    hm = hou.nodeType(type_name).hdaModule()
+    asset_templates, all_asset_templates = _read_templates(
+        getattr(hm, "asset_template", None)
+    )
+    shot_templates, all_shot_templates = _read_templates(
+        getattr(hm, "shot_template", None)
+    )
+
+    if not asset_templates and not shot_templates:
+        raise hou.NodeError(
+            "No template specified on Houdini node. hm().asset_template "
+            "and/or hm().asset_template should be created."
+        )
+
+    menu_entries = tuple(
+        {
+            "label": "Asset ({template})".format(template=template_item),
+            "template": template_item,
+        }
+        for template_item in asset_templates
+    ) + tuple(
+        {
+            "label": "Shot ({template})".format(template=template_item),
+            "template": template_item,
+        }
+        for template_item in shot_templates
+    )
+
+    return (
+        asset_templates,
+        shot_templates,
+        all_asset_templates,
+        all_shot_templates,
+        menu_entries,
+    )
+
+
+@functools.lru_cache(maxsize=128)
+def published_file_type_code_for_type(type_name):
+    """Load the published_file_type_code from the PythonModule of the given HDA type.
+
+    Args:
+        type_name(str): The node type name including its category.
+
+    Returns:
+        (str): The name of the node type's published file type.
+
+    Raises:
+        NodeError: published_file_type_code missing from the node type's houdini
+            module.
+    """
+    hm = hou.nodeType(type_name).hdaModule()
+    if hasattr(hm, "published_file_type_code"):
+        return hm.published_file_type_code
+
+    raise hou.NodeError(
+        "No published file type specified on Houdini node."
+        " hm().published_file_type_code should be created."
+    )
+
+
 class ShotgunNode(object):
     """Shotgun Node for houdini HDAs to add support for SG menus."""
 
+    __slots__ = (
+        "_all_menu_names",
+        "_all_menus",
+        "_cascade_parms",
+        "_context_message",
+        "_default_template",
+        "_has_asset_menus",
+        "_has_shot_menus",
+        "_last_cascade_state",
+        "_menu_list_cache",
+        "_menus_dirty",
+        "_override_parms",
+        "_parm_cache",
+        "_parm_value_cache",
+        "all_asset_templates",
+        "all_asset_templates_by_usd",
+        "all_shot_templates",
+        "all_shot_templates_by_usd",
+        "asset_menu",
+        "asset_step_menu",
+        "asset_task_menu",
+        "asset_templates",
+        "asset_type_menu",
+        "current_node",
+        "hip_templates",
+        "missing_template",
+        "output_path",
+        "output_root",
+        "output_version",
+        "published_file_type",
+        "published_file_type_code",
+        "sequence_menu",
+        "sg_asset_menus",
+        "sg_context",
+        "sg_load",
+        "sg_shared_menus",
+        "sg_shot_menus",
+        "sg_template",
+        "sg_version_menu",
+        "shot_menu",
+        "shot_step_menu",
+        "shot_task_menu",
+        "shot_templates",
+        "template_menu",
+        "templates",
+    )
+
     __config = get_config()
     sg_script = __config.get("sg_script")
     sg_key = __config.get("sg_key")
 
+    # The menus generated by each cascade in order, see _run_cascade
+    _CASCADE_STEPS = {
+        "asset": ("asset_type", "asset", "step", "task"),
+        "shot": ("sequence", "shot", "shot_step", "shot_task"),
+    }
+
+    # Cascade menus whose selection is a name rather than an entity ID
+    _NAME_MENUS = frozenset(("asset_type", "sequence"))
+
+    # The menu update to run when each SG menu parm changes, see update_from
+    _CASCADE_FROM = {
+        "asset_type": "update_asset_menu",
+        "asset": "update_step_menu",
+        "step": "update_task_menu",
+        "task": "update_version_menu",
+        "sequence": "update_shot_menu",
+        "shot": "update_shot_step_menu",
+        "shot_step": "update_shot_task_menu",
+        "shot_task": "update_version_menu",
+    }
+
     def __init__(self, current_node, publish=False):
         """Initialise the class based on the given node.
 
@@ -34,10 +230,8 @@ class ShotgunNode(object):
             publish(bool): Is the node a publish node.
         """
         self.current_node = current_node
-        self.sg_load = load.ShotgunLoad.get_instance(
-            self.sg_script,
-            self.sg_key,
-        )
+        self._parm_cache = {}
+        self.sg_load = sgcache.get_sg_load(self.sg_script, self.sg_key)
         self.published_file_type_code = self.__load_published_file_type_code()
         self.published_file_type = self.sg_load.get_published_file_type(
             self.published_file_type_code,
@@ -51,84 +245,91 @@ class ShotgunNode(object):
         self.shot_templates = list()
         self.all_asset_templates = list()
         self.all_shot_templates = list()
+        self.all_asset_templates_by_usd = dict()
+        self.all_shot_templates_by_usd = dict()
+        self._default_template = ""
         self.hip_templates = [
             "houdini_asset_work",
             "houdini_asset_publish",
             "houdini_shot_work",
             "houdini_shot_publish",
         ]
-        self.sg_template = template.SGTemplate(
-            self.sg_script,
-            self.sg_key,
-        )
+
+        # The templates are cached per node type and don't query SG, so load them
+        # straight away rather than waiting for the menus to be built
+        self.templates = self.__load_templates()
+
+        self.sg_template = sgcache.get_sg_template(self.sg_script, self.sg_key)
         self.sg_context = context.HoudiniSGContext(
             self,
             self.sg_script,
             self.sg_key,
         )
 
+        self.sg_shared_menus = {}
         self.sg_asset_menus = {}
         self.sg_shot_menus = {}
-
-        self.template_menu = sgmenu.SGMenu(
-            self.sg_context, self.current_node.parm("template")
-        )
-        self.sg_asset_menus["template"] = self.template_menu
-        self.sg_shot_menus["template"] = self.template_menu
-
-        self.asset_type_menu = sgmenu.SGMenu(
-            self.sg_context, self.current_node.parm("asset_type")
-        )
+        self._all_menus = {}
+        self._all_menu_names = ()
+        self._cascade_parms = {}
+        self._override_parms = {}
+        self._menu_list_cache = {}
+        self._menus_dirty = False
+        self._parm_value_cache = {}
+        self._last_cascade_state = {}
+        self._context_message = None
+
+        self.template_menu = sgmenu.SGMenu(self.sg_context, self._parm("template"))
+        self.sg_shared_menus["template"] = self.template_menu
+
+        self.asset_type_menu = sgmenu.SGMenu(self.sg_context, self._parm("asset_type"))
         self.sg_asset_menus["asset_type"] = self.asset_type_menu
 
-        self.asset_menu = sgmenu.SGMenu(
-            self.sg_context, self.current_node.parm("asset")
-        )
+        self.asset_menu = sgmenu.SGMenu(self.sg_context, self._parm("asset"))
         self.sg_asset_menus["asset"] = self.asset_menu
 
-        self.asset_step_menu = sgmenu.SGMenu(
-            self.sg_context, self.current_node.parm("step")
-        )
+        self.asset_step_menu = sgmenu.SGMenu(self.sg_context, self._parm("step"))
         self.sg_asset_menus["step"] = self.asset_step_menu
 
-        self.asset_task_menu = sgmenu.SGMenu(
-            self.sg_context, self.current_node.parm("task")
-        )
+        self.asset_task_menu = sgmenu.SGMenu(self.sg_context, self._parm("task"))
         self.sg_asset_menus["task"] = self.asset_task_menu
 
-        self.sequence_menu = sgmenu.SGMenu(
-            self.sg_context, self.current_node.parm("sequence")
-        )
+        self.sequence_menu = sgmenu.SGMenu(self.sg_context, self._parm("sequence"))
         self.sg_shot_menus["sequence"] = self.sequence_menu
 
-        self.shot_menu = sgmenu.SGMenu(self.sg_context, self.current_node.parm("shot"))
+        self.shot_menu = sgmenu.SGMenu(self.sg_context, self._parm("shot"))
         self.sg_shot_menus["shot"] = self.shot_menu
 
-        self.shot_step_menu = sgmenu.SGMenu(
-            self.sg_context, self.current_node.parm("shot_step")
-        )
+        self.shot_step_menu = sgmenu.SGMenu(self.sg_context, self._parm("shot_step"))
         self.sg_shot_menus["shot_step"] = self.shot_step_menu
 
-        self.shot_task_menu = sgmenu.SGMenu(
-            self.sg_context, self.current_node.parm("shot_task")
-        )
+        self.shot_task_menu = sgmenu.SGMenu(self.sg_context, self._parm("shot_task"))
         self.sg_shot_menus["shot_task"] = self.shot_task_menu
 
-        version = self.current_node.parm("version")
+        version = self._parm("version")
         if version:
             self.sg_version_menu = sgmenu.SGMenu(self.sg_context, version)
             self.sg_asset_menus["version"] = self.sg_version_menu
             self.sg_shot_menus["version"] = self.sg_version_menu
 
-        # Refresh the menus
-        self.update_all_menus()
+        self.invalidate_menus()
 
-        logger.info(
-            "ShotgunNode intitalised for {node}".format(
-                node=self.current_node,
-            )
+        # The parms on the node are fixed, so only check for the menus once
+        self._has_asset_menus = self.__has_asset_menus()
+        self._has_shot_menus = self.__has_shot_menus()
+
+        # The menus are built from SG the first time they are needed, see
+        # ensure_menus
+        self._menus_dirty = True
+
+        # Drop any cached parm values when a parm is changed on the node
+        self.current_node.addEventCallback(
+            (hou.nodeEventType.ParmTupleChanged,),
+            self._on_parm_changed,
         )
 
+        logger.info("ShotgunNode intitalised for %s", self.current_node)
+
     @classmethod
     def get_shotgun_node(cls, current_node):
         """Load the current instance of the SG Node.
@@ -166,6 +367,12 @@ class ShotgunNode(object):
             "This method of initialising is deprecated. `get_shotgun_node` should be "
             "used instead."
         )
+
+        # Stop the instance being replaced from watching the node
+        previous = current_node.cachedUserData("sg_node")
+        if previous is not None:
+            previous.remove_callbacks()
+
         current_node.setCachedUserData(
             "sg_init",
             True,
@@ -196,15 +403,12 @@ class ShotgunNode(object):
         Returns:
             bool: Does the current node have SG asset menus.
         """
-        if (
-            self.current_node.parm("asset_type")
-            and self.current_node.parm("asset")
-            and self.current_node.parm("step")
-            and self.current_node.parm("task")
-        ):
-            return True
-
-        return False
+        return bool(
+            self._parm("asset_type")
+            and self._parm("asset")
+            and self._parm("step")
+            and self._parm("task")
+        )
 
     def __has_shot_menus(self):
         """Check if the current node includes the shot menus.
@@ -212,14 +416,9 @@ class ShotgunNode(object):
         Returns:
             bool: Does the current node have SG shot menus.
         """
-        if (
-            self.current_node.parm("shot")
-            and self.current_node.parm("shot_step")
-            and self.current_node.parm("shot_task")
-        ):
-            return True
-
-        return False
+        return bool(
+            self._parm("shot") and self._parm("shot_step") and self._parm("shot_task")
+        )
 
     def in_asset_mode(self):
         """Check if the current node is in asset mode.
@@ -256,9 +455,9 @@ class ShotgunNode(object):
             str: The version number for the file being loaded.
         """
         # If "latest" and "version" parameters exist report the version
-        if self.current_node.parm("latest") and self.current_node.parm("version"):
-            if not self.current_node.evalParm("latest"):
-                version = self.current_node.evalParm("version")
+        if self._parm("latest") and self._parm("version"):
+            if not self._parm("latest").eval():
+                version = self._parm("version").eval()
                 if version:
                     return str(version)
                 else:
@@ -283,6 +482,22 @@ class ShotgunNode(object):
         else:
             raise RuntimeError("Invalid mode. Must be either asset or shot.")
 
+    def selected_task_id(self):
+        """Get the selected task ID for the current mode.
+
+        Returns:
+            (int): The selected task ID.
+
+        Raises:
+            RuntimeError: Node must be either in asset mode or shot mode.
+        """
+        if self.in_asset_mode():
+            return self.get_parm_menu_id("task")
+        elif self.in_shot_mode():
+            return self.get_parm_menu_id("shot_task")
+        else:
+            raise RuntimeError("Invalid mode. Must be either asset or shot.")
+
     # --------------------------- Utility methods -----------------------------
 
     def get_project_name(self):
@@ -304,14 +519,19 @@ class ShotgunNode(object):
         Returns:
             (str): The selected template name for the current node.
         """
-        template = self.current_node.evalParm("template")
+        if "selected_template" in self._parm_value_cache:
+            return self._parm_value_cache["selected_template"]
+
+        template = self._parm("template").eval()
         if not template:
-            parm = self.current_node.parm("template")
+            parm = self._parm("template")
             menu_items = parm.menuItems()
             if menu_items:
                 template = menu_items[0]
             else:
                 template = None
+
+        self._parm_value_cache["selected_template"] = template
         return template
 
     # ------------------------- Load data from the node -------------------------------
@@ -321,17 +541,10 @@ class ShotgunNode(object):
 
         Returns:
             (str): The name of the current nodes published file type.
-
-        Raises:
-            NodeError: Template missing from current nodes houdini module.
         """
-        if hasattr(self.current_node.hm(), "published_file_type_code"):
-            return self.current_node.hm().published_file_type_code
-        else:
-            raise hou.NodeError(
-                "No published file type specified on Houdini node."
-                " hm().published_file_type_code should be created."
-            )
+        return published_file_type_code_for_type(
+            self.current_node.type().nameWithCategory()
+        )
 
     def __load_templates(self):
         """Load the templates for the Node.
@@ -339,73 +552,51 @@ class ShotgunNode(object):
         Returns:
             list: A list of template details used for the template menu on the
                 node.
-
-        Raises:
-            NodeError: Template missing from current nodes houdini module.
         """
-        templates = []
+        (
+            asset_templates,
+            shot_templates,
+            all_asset_templates,
+            all_shot_templates,
+            menu_entries,
+        ) = templates_for_type(self.current_node.type().nameWithCategory())
+
+        self.asset_templates = list(asset_templates)
+        self.shot_templates = list(shot_templates)
+        if all_asset_templates:
+            self.all_asset_templates = list(all_asset_templates)
+        if all_shot_templates:
+            self.all_shot_templates = list(all_shot_templates)
+        self.all_asset_templates_by_usd = _index_templates(self.all_asset_templates)
+        self.all_shot_templates_by_usd = _index_templates(self.all_shot_templates)
+
+        if self.asset_templates:
+            self._default_template = self.asset_templates[0]
+        elif self.shot_templates:
+            self._default_template = self.shot_templates[0]
+        else:
+            self._default_template = ""
 
-        if (
-            hasattr(self.current_node.hm(), "asset_template")
-            and self.current_node.hm().asset_template
-        ):
-            # Read SG template from node
-            if isinstance(self.current_node.hm().asset_template, list) and all(
-                isinstance(n, dict) for n in self.current_node.hm().asset_template
-            ):
-                self.asset_templates = [
-                    template.get("usd")
-                    for template in self.current_node.hm().asset_template
-                ]
-                self.all_asset_templates = self.current_node.hm().asset_template
-            elif isinstance(self.current_node.hm().asset_template, list):
-                self.asset_templates = self.current_node.hm().asset_template
-            else:
-                self.asset_templates = [self.current_node.hm().asset_template]
-            for template_item in self.asset_templates:
-                label = "Asset ({template})".format(template=template_item)
-                templates.append(
-                    {
-                        "label": label,
-                        "template": template_item,
-                    }
-                )
+        return list(menu_entries)
 
-        if (
-            hasattr(self.current_node.hm(), "shot_template")
-            and self.current_node.hm().shot_template
-        ):
-            # Read SG template from node
-            if isinstance(self.current_node.hm().shot_template, list) and all(
-                isinstance(n, dict) for n in self.current_node.hm().shot_template
-            ):
-                self.shot_templates = [
-                    template.get("usd")
-                    for template in self.current_node.hm().shot_template
-                ]
-                self.all_shot_templates = self.current_node.hm().shot_template
-            elif isinstance(self.current_node.hm().shot_template, list):
-                self.shot_templates = self.current_node.hm().shot_template
-            else:
-                self.shot_templates = [self.current_node.hm().shot_template]
-            for template_item in self.shot_templates:
-                label = "Shot ({template})".format(template=template_item)
-                templates.append(
-                    {
-                        "label": label,
-                        "template": template_item,
-                    }
-                )
+    # --------------------------- Update the menus ------------------------------------
 
-        if not self.asset_templates and not self.shot_templates:
-            raise hou.NodeError(
-                "No template specified on Houdini node. hm().asset_template "
-                "and/or hm().asset_template should be created."
-            )
+    def _fetch_menu_data(self, method_name, *args, **kwargs):
+        """Fetch the SG data used to populate one of the menus in the cascade.
 
-        return templates
+        Results are shared through the process wide SG cache, so nodes with the same
+        selections don't re-query SG.
 
-    # --------------------------- Update the menus ------------------------------------
+        Args:
+            method_name(str): The name of the ShotgunLoad method to call.
+            *args: Positional arguments to pass to the method.
+            **kwargs: Keyword arguments to pass to the method. `force=True` bypasses
+                the cache.
+
+        Returns:
+            The (cached) SG data for the menu.
+        """
+        return sgcache.cached_call(self.sg_load, method_name, *args, **kwargs)
 
     def update_all_menus(self, force=False):
         """Update all the menus on the node.
@@ -413,11 +604,60 @@ class ShotgunNode(object):
         Args:
             force(bool): Force data to be re-loaded from SG.
         """
+        self._menus_dirty = False
+        self._last_cascade_state.clear()
+        self.invalidate_parm_cache()
+
+        # The context may have changed since the menus were last built
+        if force:
+            self.sg_context.refresh()
+        else:
+            self.sg_context.invalidate()
         self.update_templates_menu(force=force)
-        if self.__has_asset_menus():
-            self.update_asset_types_menu(force=force)
-        if self.__has_shot_menus():
-            self.update_sequence_menu(force=force)
+
+        if self._has_asset_menus:
+            self._run_cascade("asset", force=force)
+        if self._has_shot_menus:
+            self._run_cascade("shot", force=force)
+
+    def update_from(self, parm_name, force=False):
+        """Update only the menus downstream of the given parm.
+
+        If the parm value hasn't changed since the last update from the same parm
+        (eg. the callback has fired twice) the update is skipped. Parms that aren't
+        part of the cascade (such as the template) update all of the menus, as does
+        any parm if the menus haven't been built yet.
+
+        Args:
+            parm_name(str): The name of the parm that has changed.
+            force(bool): Force data to be re-loaded from SG.
+        """
+        method_name = self._CASCADE_FROM.get(parm_name)
+        if not method_name or self._menus_dirty:
+            self.update_all_menus(force=force)
+            return
+
+        self.invalidate_parm_cache()
+        value = self.get_parm_menu_value(parm_name)
+        last_state = self._last_cascade_state
+        if not force and parm_name in last_state and last_state[parm_name] == value:
+            logger.debug("%s unchanged, skipping update.", parm_name)
+            return
+
+        # Only remember the most recent update, any other cascade may have changed
+        # the menus downstream of an older one
+        self._last_cascade_state = {parm_name: value}
+        getattr(self, method_name)(force=force)
+
+    def ensure_menus(self):
+        """Build the menus if they haven't been built since the node was initialised.
+
+        The menu cascade issues a number of SG queries, so rather than running it for
+        every node as it is initialised it is deferred until a menu (or a value
+        derived from the menus) is first requested.
+        """
+        if self._menus_dirty:
+            self.update_all_menus()
 
     def update_templates_menu(self, force=False):
         """Update the template menu.
@@ -425,6 +665,9 @@ class ShotgunNode(object):
         Args:
             force(bool): Force data to be re-loaded from SG.
         """
+        # Selections may have changed since the previous menu was generated
+        self.invalidate_parm_cache()
+
         # First refresh the cache
         self.templates = self.__load_templates()
 
@@ -433,20 +676,56 @@ class ShotgunNode(object):
             self.templates, "template", "label", force=force
         )
 
+    def _run_cascade(self, kind, force=False, start=None):
+        """Generate the asset or shot menus in order, then update the version menu.
+
+        The selection from each menu is recorded once it has been generated and
+        handed to the menus below it, so each selection is only read once per cascade.
+
+        Args:
+            kind(str): The cascade to run, either "asset" or "shot".
+            force(:obj:`bool`, optional): Force data to be re-loaded from SG.
+            start(:obj:`str`, optional): The parm name of the first menu to generate,
+                defaults to the top of the cascade.
+        """
+        steps = self._CASCADE_STEPS[kind]
+        index = steps.index(start) if start else 0
+
+        # Selections may have changed since the previous menu was generated
+        self.invalidate_parm_cache()
+        selected = {
+            parm_name: self.__read_selection(parm_name) for parm_name in steps[:index]
+        }
+
+        for parm_name in steps[index:]:
+            getattr(self, "_generate_{parm}_menu".format(parm=parm_name))(
+                selected, force
+            )
+            selected[parm_name] = self.__read_selection(parm_name)
+
+        self.update_version_menu()
+
+    def __read_selection(self, parm_name):
+        """Read the selection from a cascade menu, as an ID if it is an entity menu.
+
+        Args:
+            parm_name(str): The parm name of the menu to read.
+
+        Returns:
+            The selected name or ID.
+        """
+        if parm_name in self._NAME_MENUS:
+            return self.get_parm_menu_value(parm_name)
+
+        return self.get_parm_menu_id(parm_name)
+
     def update_asset_types_menu(self, force=False):
         """Update the asset type menu.
 
         Args:
             force(bool): Force data to be re-loaded from SG.
         """
-        # Update the menu list
-        asset_types = self.sg_load.get_asset_types()
-        self.get_menu("asset_type").generate_menu(
-            asset_types, "name", "name", force=force
-        )
-
-        # Cascade the update to the next menu
-        self.update_asset_menu(force=force)
+        self._run_cascade("asset", force=force)
 
     def update_asset_menu(self, force=False):
         """Update the asset menu.
@@ -454,162 +733,202 @@ class ShotgunNode(object):
         Args:
             force(bool): Force data to be re-loaded from SG.
         """
-        asset_type = self.get_parm_menu_value("asset_type")
+        self._run_cascade("asset", force=force, start="asset")
 
-        # First refresh the cache
+    def update_step_menu(self, force=False):
+        """Update the step menu.
+
+        Args:
+            force(bool): Force data to be re-loaded from SG.
+        """
+        self._run_cascade("asset", force=force, start="step")
+
+    def update_task_menu(self, force=False):
+        """Update the task menu.
+
+        Args:
+            force(bool): Force data to be re-loaded from SG.
+        """
+        self._run_cascade("asset", force=force, start="task")
+
+    def update_sequence_menu(self, force=False):
+        """Update the sequence menu.
+
+        Args:
+            force(bool): Force data to be re-loaded from SG.
+        """
+        self._run_cascade("shot", force=force)
+
+    def update_shot_menu(self, force=False):
+        """Update the shot menu.
+
+        Args:
+            force(bool): Force data to be re-loaded from SG.
+        """
+        self._run_cascade("shot", force=force, start="shot")
+
+    def update_shot_step_menu(self, force=False):
+        """Update the shot step menu.
+
+        Args:
+            force(bool): Force data to be re-loaded from SG.
+        """
+        self._run_cascade("shot", force=force, start="shot_step")
+
+    def update_shot_task_menu(self, force=False):
+        """Update the shot task menu.
+
+        Args:
+            force(bool): Force data to be re-loaded from SG.
+        """
+        self._run_cascade("shot", force=force, start="shot_task")
+
+    def _generate_asset_type_menu(self, selected, force):
+        """Generate the asset type menu.
+
+        Args:
+            selected(dict): The selections from the menus above in the cascade.
+            force(bool): Force data to be re-loaded from SG.
+        """
+        asset_types = self._fetch_menu_data("get_asset_types", force=force)
+        self.get_menu("asset_type").generate_menu(
+            asset_types, "name", "name", force=force
+        )
+
+    def _generate_asset_menu(self, selected, force):
+        """Generate the asset menu.
+
+        Args:
+            selected(dict): The selections from the menus above in the cascade.
+            force(bool): Force data to be re-loaded from SG.
+        """
+        asset_type = selected["asset_type"]
         if asset_type:
-            assets = self.sg_load.get_assets(asset_type=asset_type)
+            assets = self._fetch_menu_data(
+                "get_assets", asset_type=asset_type, force=force
+            )
         else:
             logger.warning("No asset_type found, skipping loading assets.")
             assets = []
 
-        # Update the menu
         self.get_menu("asset").generate_menu(assets, "id", "code", force=force)
 
-        # Cascade the update to the next menu
-        self.update_step_menu(force=force)
-
-    def update_step_menu(self, force=False):
-        """Update the step menu.
+    def _generate_step_menu(self, selected, force):
+        """Generate the step menu.
 
         Args:
+            selected(dict): The selections from the menus above in the cascade.
             force(bool): Force data to be re-loaded from SG.
         """
-        # Keep track of currently selected step
-        selected_asset = self.get_parm_menu_value("asset")
-        if selected_asset:
-            selected_asset = int(selected_asset)
-
-        # First refresh the cache
+        selected_asset = selected["asset"]
         if selected_asset:
-            steps = self.sg_load.get_asset_steps(asset=selected_asset)
+            steps = self._fetch_menu_data(
+                "get_asset_steps", asset=selected_asset, force=force
+            )
         else:
             logger.warning("No asset found, skipping loading steps.")
             steps = []
 
-        # Update the menu
         self.get_menu("step").generate_menu(
             steps, "step.Step.id", "step.Step.code", force=force
         )
 
-        # Cascade the update to the next menu
-        self.update_task_menu(force=force)
-
-    def update_task_menu(self, force=False):
-        """Update the task menu.
+    def _generate_task_menu(self, selected, force):
+        """Generate the task menu.
 
         Args:
+            selected(dict): The selections from the menus above in the cascade.
             force(bool): Force data to be re-loaded from SG.
         """
-        # Keep track of currently selected asset_type
-        selected_asset = self.get_parm_menu_value("asset")
-        if selected_asset:
-            selected_asset = int(selected_asset)
-        selected_step = self.get_parm_menu_value("step")
-        if selected_step:
-            selected_step = int(selected_step)
-
-        # First refresh the cache
+        selected_asset = selected["asset"]
+        selected_step = selected["step"]
         if selected_asset and selected_step:
-            tasks = self.sg_load.get_asset_tasks(
+            tasks = self._fetch_menu_data(
+                "get_asset_tasks",
                 asset=selected_asset,
                 step=selected_step,
+                force=force,
             )
         else:
             logger.warning("No asset/step found, skipping loading tasks.")
             tasks = []
 
-        # Update the menu
         self.get_menu("task").generate_menu(tasks, "id", "content", force=force)
 
-        self.update_version_menu()
-
-    def update_sequence_menu(self, force=False):
-        """Update the sequence menu.
+    def _generate_sequence_menu(self, selected, force):
+        """Generate the sequence menu.
 
         Args:
+            selected(dict): The selections from the menus above in the cascade.
             force(bool): Force data to be re-loaded from SG.
         """
-        # First refresh the cache
-        sequences = self.sg_load.get_sequences()
-
-        # Update the menu list
+        sequences = self._fetch_menu_data("get_sequences", force=force)
         self.get_menu("sequence").generate_menu(sequences, "name", "name", force=force)
 
-        # Cascade the update to the next menu
-        self.update_shot_menu(force=force)
-
-    def update_shot_menu(self, force=False):
-        """Update the shot menu.
+    def _generate_shot_menu(self, selected, force):
+        """Generate the shot menu.
 
         Args:
+            selected(dict): The selections from the menus above in the cascade.
             force(bool): Force data to be re-loaded from SG.
         """
-        # Keep track of currently selected shot
-        selected_sequence = self.get_menu("sequence").get_selection()
-
-        # First refresh the cache
+        selected_sequence = selected["sequence"]
         if selected_sequence:
-            shots = self.sg_load.get_shots(sequence=selected_sequence)
+            shots = self._fetch_menu_data(
+                "get_shots", sequence=selected_sequence, force=force
+            )
         else:
             logger.warning("No sequence found, skipping loading shots.")
             shots = []
 
-        # Update the menu list
         self.get_menu("shot").generate_menu(shots, "id", "code", force=force)
 
-        # Cascade the update to the next menu
-        self.update_shot_step_menu(force=force)
-
-    def update_shot_step_menu(self, force=False):
-        """Update the shot step menu.
+    def _generate_shot_step_menu(self, selected, force):
+        """Generate the shot step menu.
 
         Args:
+            selected(dict): The selections from the menus above in the cascade.
             force(bool): Force data to be re-loaded from SG.
         """
-        # First refresh the cache
-        selected_shot = self.get_menu("shot").get_selection()
-
+        selected_shot = selected["shot"]
         if selected_shot:
-            shot_steps = self.sg_load.get_shot_steps(shot=int(selected_shot))
+            shot_steps = self._fetch_menu_data(
+                "get_shot_steps",
+                shot=selected_shot,
+                force=force,
+            )
         else:
             logger.warning("No shot found, skipping loading steps.")
             shot_steps = []
 
-        # Update the menu
         self.get_menu("shot_step").generate_menu(
             shot_steps, "step.Step.id", "step.Step.code", force=force
         )
 
-        # Cascade the update to the next menu
-        self.update_shot_task_menu(force=force)
-
-    def update_shot_task_menu(self, force=False):
-        """Update the shot task menu.
+    def _generate_shot_task_menu(self, selected, force):
+        """Generate the shot task menu.
 
         Args:
+            selected(dict): The selections from the menus above in the cascade.
             force(bool): Force data to be re-loaded from SG.
         """
-        # First refresh the cache
-        selected_shot = self.get_menu("shot").get_selection()
-        selected_step = self.get_menu("shot_step").get_selection()
-
+        selected_shot = selected["shot"]
+        selected_step = selected["shot_step"]
         if selected_shot and selected_step:
-            shot_tasks = self.sg_load.get_shot_tasks(
-                shot=int(selected_shot),
-                step=int(selected_step),
+            shot_tasks = self._fetch_menu_data(
+                "get_shot_tasks",
+                shot=selected_shot,
+                step=selected_step,
+                force=force,
             )
         else:
             logger.warning("No shot/step found, skipping loading tasks.")
             shot_tasks = []
 
-        # Update the menu
         self.get_menu("shot_task").generate_menu(
             shot_tasks, "id", "content", force=force
         )
 
-        self.update_version_menu()
-
     def update_version_menu(self, force=False):
         """Update the version menu.
 
@@ -619,20 +938,18 @@ class ShotgunNode(object):
         Raises:
             RuntimeError: Node must be in either asset mode or shot mode.
         """
-        if self.current_node.parm("latest") and (
-            force or not self.current_node.evalParm("latest")
+        # Selections may have changed since the previous menu was generated
+        self.invalidate_parm_cache()
+
+        if self._parm("latest") and (
+            force or not self._parm("latest").eval()
         ):
             logger.info("Updating version menu.")
-            if self.in_asset_mode():
-                task = self.get_menu("task").get_selection()
-            elif self.in_shot_mode():
-                task = self.get_menu("shot_task").get_selection()
-            else:
-                raise RuntimeError("Invalid mode. Must be either asset or shot.")
-
-            versions = self.sg_load.get_versions(
-                int(task),
+            versions = self._fetch_menu_data(
+                "get_versions",
+                self.selected_task_id(),
                 published_file_type=self.published_file_type_code,
+                force=force,
             )
 
             self.sg_version_menu.generate_menu(
@@ -643,6 +960,7 @@ class ShotgunNode(object):
                 force=force,
             )
 
+        self.invalidate_menus()
         self.menus_updated()
 
     def menus_updated(self):
@@ -655,7 +973,7 @@ class ShotgunNode(object):
 
     def update_mode(self):
         """Handle the case of the mode menu changing."""
-        mode = self.current_node.parm("mode")
+        mode = self._parm("mode")
         if mode and mode.evalAsString() == "auto":
             self.update_all_menus(force=True)
 
@@ -667,11 +985,13 @@ class ShotgunNode(object):
         syncnodeversion node callback to manually set the sequence to the correct value
         in there cases.
         """
-        selected_shot = self.get_menu("shot").get_selection()
+        selected_shot = self.get_parm_menu_id("shot")
         if selected_shot:
-            sequence = self.sg_load.sequence_name_from_shot_id(int(selected_shot))
-            self.current_node.parm("sequence").set(sequence)
-            self.update_all_menus()
+            sequence = self.sg_load.sequence_name_from_shot_id(selected_shot)
+            self._parm("sequence").set(sequence)
+
+            # Only the shot menus below the sequence need to be updated
+            self.update_from("sequence")
 
     def get_template_menu(self):
         """Get the value from the template menu.
@@ -681,8 +1001,7 @@ class ShotgunNode(object):
         Returns:
             menu(:obj: list of `str`): The list of menu entries required for the menu.
         """
-        menu = self.template_menu.get_menu()
-        return menu
+        return self.get_menu_list("template")
 
     def __raw_version(self):
         """Read the current version from SG for the selected task_id.
@@ -693,15 +1012,8 @@ class ShotgunNode(object):
         Raises:
             RuntimeError: Node must be in either asset or shot mode.
         """
-        if self.in_asset_mode():
-            task = self.get_menu("task").get_selection()
-        elif self.in_shot_mode():
-            task = self.get_menu("shot_task").get_selection()
-        else:
-            raise RuntimeError("Invalid mode. Must be either asset or shot.")
-
         return self.sg_load.current_version(
-            int(task),
+            self.selected_task_id(),
             published_file_type=self.published_file_type_code,
         )
 
@@ -735,12 +1047,84 @@ class ShotgunNode(object):
             (rbl_pipe_houdini.shotgun.sgmenu.SGMenu): The SG menu instance for the
                 given parm name.
         """
-        if parm_name in self.sg_asset_menus:
-            return self.sg_asset_menus.get(parm_name)
-        elif parm_name in self.sg_shot_menus:
-            return self.sg_shot_menus.get(parm_name)
+        self.ensure_menus()
+        return self._all_menus.get(parm_name)
+
+    def invalidate_menus(self):
+        """Rebuild the merged menu lookups and clear any cached parm values."""
+        # Asset menus take precedence for the menus shared by both modes
+        self._all_menus = dict(self.sg_shot_menus)
+        self._all_menus.update(self.sg_asset_menus)
+        self._all_menus.update(self.sg_shared_menus)
+        self._menu_list_cache.clear()
+        shared_names = tuple(self.sg_shared_menus)
+        self._all_menu_names = (
+            shared_names + tuple(self.sg_asset_menus) + tuple(self.sg_shot_menus)
+        )
+        self._override_parms = {
+            parm_name: menu.override_parm for parm_name, menu in self._all_menus.items()
+        }
+
+        # The menus each parm cascades its override to, see configure_menus
+        asset_names = tuple(self.sg_asset_menus)
+        shot_names = tuple(self.sg_shot_menus)
+        self._cascade_parms = {}
+        for index, parm_name in enumerate(shot_names):
+            self._cascade_parms[parm_name] = shot_names[index:]
+        for index, parm_name in enumerate(asset_names):
+            if parm_name in self.sg_shot_menus:
+                start = index + len(shared_names)
+                self._cascade_parms[parm_name] = self._all_menu_names[start:]
+            else:
+                self._cascade_parms[parm_name] = asset_names[index:]
+        for index, parm_name in enumerate(shared_names):
+            self._cascade_parms[parm_name] = self._all_menu_names[index:]
 
-        return None
+        self.invalidate_parm_cache()
+
+    def invalidate_parm_cache(self, parm_name=None):
+        """Clear the cached menu parm values.
+
+        Menu selections cascade, so changing one parm can affect the value of any of
+        the other menus. All values are cleared regardless of the parm given.
+
+        Args:
+            parm_name(:obj:`str`, optional): The name of the parm that changed.
+        """
+        self._parm_value_cache.clear()
+
+    def remove_callbacks(self):
+        """Remove the node event callbacks added by this instance and its context.
+
+        Should be called when the instance is replaced, so it stops watching the node.
+        """
+        try:
+            self.current_node.removeEventCallback(
+                (hou.nodeEventType.ParmTupleChanged,),
+                self._on_parm_changed,
+            )
+        except (hou.ObjectWasDeleted, hou.OperationFailed):
+            logger.debug("Parm changed callback already removed.")
+
+        self.sg_context.remove_callbacks()
+
+    def _on_parm_changed(self, **kwargs):
+        """Houdini node event callback run when a parm changes on the node.
+
+        Args:
+            **kwargs: The Houdini node event callback arguments.
+        """
+        parm_tuple = kwargs.get("parm_tuple")
+        self.invalidate_parm_cache(parm_tuple.name() if parm_tuple else None)
+
+        # Keep the menus' cached override state in step with their override parms
+        if parm_tuple is None:
+            for menu in self._all_menus.values():
+                menu.clear_override_cache()
+        elif parm_tuple.name().startswith("override_"):
+            menu = self._all_menus.get(parm_tuple.name()[len("override_") :])
+            if menu:
+                menu.clear_override_cache()
 
     def parm_overriden(self, parm_name):
         """Check if the given parm name is overriden.
@@ -751,10 +1135,38 @@ class ShotgunNode(object):
         Returns:
             (bool): Is the given parm overriden.
         """
-        override_parm_name = "override_{parm}".format(parm=parm_name)
-        override_parm = self.current_node.parm(override_parm_name)
+        override_parm = self._override_parm(parm_name)
         return override_parm and override_parm.eval()
 
+    def _parm(self, parm_name):
+        """Get the (cached) parm handle for the given parm name on the current node.
+
+        Args:
+            parm_name(str): The name of the parm.
+
+        Returns:
+            (hou.Parm): The parm, or None if it doesn't exist on the node.
+        """
+        if parm_name not in self._parm_cache:
+            self._parm_cache[parm_name] = self.current_node.parm(parm_name)
+
+        return self._parm_cache[parm_name]
+
+    def _override_parm(self, parm_name):
+        """Get the override parm for the given menu parm name.
+
+        Args:
+            parm_name(str): The name of the menu parm.
+
+        Returns:
+            (hou.Parm): The override parm, or None if it doesn't exist on the node.
+        """
+        # The menus already resolved their override parms, including missing ones
+        if parm_name in self._override_parms:
+            return self._override_parms[parm_name]
+
+        return self._parm("override_{parm}".format(parm=parm_name))
+
     def get_menu_list(self, parm_name):
         """
         Get the menu list for the given parm name.
@@ -765,10 +1177,15 @@ class ShotgunNode(object):
         Returns:
             menu(list): The menu list for the given parm.
         """
-        menu = []
-        node_menu = self.get_menu(parm_name)
-        if node_menu:
-            menu = node_menu.get_menu()
+        menu = self._menu_list_cache.get(parm_name)
+        if menu is None:
+            menu = []
+            node_menu = self.get_menu(parm_name)
+            if node_menu:
+                # Menus are regenerated in place, so the list can be reused
+                menu = node_menu.get_menu()
+                self._menu_list_cache[parm_name] = menu
+
         return menu
 
     def get_parm_menu_value(self, parm_name):
@@ -780,7 +1197,26 @@ class ShotgunNode(object):
         Returns:
             The value of the given SG menu parm.
         """
-        return self.get_menu(parm_name).get_selection()
+        if parm_name not in self._parm_value_cache:
+            self._parm_value_cache[parm_name] = self.get_menu(parm_name).get_selection()
+
+        return self._parm_value_cache[parm_name]
+
+    def get_parm_menu_id(self, parm_name):
+        """Get the value of the given SG menu parm as an integer ID.
+
+        Args:
+            parm_name(str): The parm name to lookup the current ID for.
+
+        Returns:
+            (int): The ID selected in the given SG menu, or None if nothing is selected.
+        """
+        key = (parm_name, int)
+        if key not in self._parm_value_cache:
+            value = self.get_parm_menu_value(parm_name)
+            self._parm_value_cache[key] = int(value) if value else None
+
+        return self._parm_value_cache[key]
 
     def context_overriden(self):
         """
@@ -789,14 +1225,7 @@ class ShotgunNode(object):
         Returns:
             (bool): Is the context overriden using the SG menus.
         """
-        for parm_name in self.sg_asset_menus.keys():
-            if self.parm_overriden(parm_name):
-                return True
-        for parm_name in self.sg_shot_menus.keys():
-            if self.parm_overriden(parm_name):
-                return True
-
-        return False
+        return any(self.parm_overriden(parm_name) for parm_name in self._all_menu_names)
 
     def update_menu_overrides(self, parm_name, overriden):
         """Update the menu override parms.
@@ -805,9 +1234,9 @@ class ShotgunNode(object):
             parm_name(str): The name of the parm to update the override for.
             overriden(bool): Should the parm be overriden.
         """
-        override_parm = self.current_node.parm("override_{parm}".format(parm=parm_name))
+        override_parm = self._override_parm(parm_name)
         if not override_parm:
-            logger.warning("Cannot configure parm {parm}".format(parm=parm_name))
+            logger.warning("Cannot configure parm %s", parm_name)
             return
 
         if overriden is None:
@@ -818,6 +1247,10 @@ class ShotgunNode(object):
         else:
             override_parm.set(0)
 
+        menu = self.get_menu(parm_name)
+        if menu:
+            menu.clear_override_cache()
+
     def configure_menus(self, parm_name=None):
         """Configure the menus on the node based on their overide parms.
 
@@ -831,23 +1264,12 @@ class ShotgunNode(object):
             return
 
         if parm_name:
-            parms = []
-            if parm_name in self.sg_asset_menus.keys():
-                parms += list(self.sg_asset_menus.keys())
-            if parm_name in self.sg_shot_menus.keys():
-                parms += list(self.sg_shot_menus.keys())
-
+            parms = self._cascade_parms.get(parm_name)
             if not parms:
-                logger.warning(
-                    "Parm couldn't be found: {parm_name}".format(
-                        parm_name=parm_name,
-                    )
-                )
+                logger.warning("Parm couldn't be found: %s", parm_name)
                 return
-            index = parms.index(parm_name)
-            parms = parms[index:]
         else:
-            parms = list(self.sg_asset_menus.keys()) + list(self.sg_shot_menus.keys())
+            parms = self._all_menu_names
 
         if parms:
             overriden = self.parm_overriden(parms[0])
@@ -860,29 +1282,46 @@ class ShotgunNode(object):
     def context_message(self):
         """Generate the context message to be displayed on the node.
 
+        The message is only regenerated when one of the context task IDs changes.
+
         Returns:
             (str): Context details string.
         """
-        custom_task_id = self.sg_context.task_id_from_custom()
-        globals_task_id = self.sg_context.task_id_from_globals()
-        hip_task_id = self.sg_context.task_id_from_hip()
+        probe = self.sg_context.task_id_probe()
+        if self._context_message and self._context_message[0] == probe:
+            return self._context_message[1]
+
+        custom_task_id, globals_task_id, hip_task_id = probe
+        message = "No context could be loaded."
         if custom_task_id is not None:
-            if self.sg_load.valid_task_id(custom_task_id):
-                return "Context from custom task ID: {task_id}".format(
+            if self.valid_task_id(custom_task_id):
+                message = "Context from custom task ID: {task_id}".format(
                     task_id=custom_task_id,
                 )
         elif globals_task_id is not None:
-            if self.sg_load.valid_task_id(globals_task_id):
-                return "Context from scene globals at: {path}".format(
-                    path=self.sg_context.get_globals_node(),
+            if self.valid_task_id(globals_task_id):
+                message = "Context from scene globals at: {path}".format(
+                    path=self.sg_context.globals_node,
                 )
         elif hip_task_id is not None:
-            if self.sg_load.valid_task_id(hip_task_id):
-                return "Context from scene path: {path}".format(
+            if self.valid_task_id(hip_task_id):
+                message = "Context from scene path: {path}".format(
                     path=hou.hipFile.path(),
                 )
 
-        return "No context could be loaded."
+        self._context_message = (probe, message)
+        return message
+
+    def valid_task_id(self, task_id):
+        """Check if the given task ID is valid, caching the result for the cache TTL.
+
+        Args:
+            task_id(int): The task ID to check.
+
+        Returns:
+            (bool): Is the task ID valid?
+        """
+        return sgcache.cached_call(self.sg_load, "valid_task_id", task_id)
 
     def invalid_context(self):
         """Check if the current context is invalid.
@@ -896,11 +1335,11 @@ class ShotgunNode(object):
         # If we are on the farm, we use the cached paths returned from the context
         # instead of the context itself. So in that case there is no need to validate
         # the context here.
-        if farm.running_on_farm():
+        if running_on_farm():
             return False
 
         task_id = self.sg_context.raw_task_id()
-        if not self.sg_load.valid_task_id(task_id) and not self.context_overriden():
+        if not self.valid_task_id(task_id) and not self.context_overriden():
             return True
         return False
 
@@ -913,17 +1352,8 @@ class ShotgunNode(object):
         Returns:
             (str): The current template.
         """
-        template_overriden = self.parm_overriden("template")
-        current_template = self.sg_context.template()
-
-        if template_overriden:
+        # The menu caches its override state until the override parm changes
+        if self._override_parm("template") and self.template_menu.is_overriden():
             return self.get_parm_menu_value("template")
-        elif current_template:
-            return current_template
-        else:
-            if self.asset_templates:
-                return self.asset_templates[0]
-            elif self.shot_templates:
-                return self.shot_templates[0]
 
-        return ""
+        return self.sg_context.template() or self._default_template
@@ -20,6 +20,14 @@ class CollectPublishNode(pyblish.api.ContextPlugin):
             context(pyblish.Context): The Houdini node instances we are validating.
         """
         publish_node = usdpublishnode.ShotgunUSDPublishNode.publish_node
-        name = publish_node.type().name()
+        name = usdpublishnode.ShotgunUSDPublishNode.publish_node_type_name
+        if name is None:
+            name = publish_node.type().name()
         instance = context.create_instance(name)
-        instance[:] = [usdpublishnode.ShotgunUSDPublishNode.publish_node]
+        instance[:] = [publish_node]
+
+        # Results of the USD stage reference scans, cached for this publish only
+        context.data["solaris_cache"] = {}
+
+        # Resolve the SG node once for the plugins that run after collection
+        usdpublishnode.get_context_shotgun_node(context, publish_node)
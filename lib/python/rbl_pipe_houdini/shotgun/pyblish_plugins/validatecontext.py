@@ -21,7 +21,7 @@ class ValidateContext(pyblish.api.InstancePlugin):
                 validating.
         """
         for node in instance:
-            sg_node = usdpublishnode.get_shotgun_node(node)
+            sg_node = usdpublishnode.get_context_shotgun_node(instance.context, node)
             self.matches_scene_context(sg_node)
 
     def matches_scene_context(self, sg_node):
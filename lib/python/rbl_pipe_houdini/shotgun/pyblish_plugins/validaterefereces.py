@@ -5,7 +5,31 @@
 import pyblish.api
 
 from rbl_pipe_houdini.shotgun import usdpublishnode
-from rbl_pipe_houdini.utils import solaris
+
+
+def _cached(context, func, path, external_references=None):
+    """Call one of the solaris reference functions, caching the result on the context.
+
+    Args:
+        context(pyblish.Context): The pyblish context being published.
+        func(callable): The solaris function to call.
+        path(str): The Houdini scene path to the node to inspect.
+        external_references(:obj:`list`, optional): The references to pass through.
+
+    Returns:
+        (list): The (cached) result of the function.
+    """
+    solaris_cache = context.data.setdefault("solaris_cache", {})
+    if external_references is None:
+        key = (func.__name__, path, None)
+        if key not in solaris_cache:
+            solaris_cache[key] = func(path)
+    else:
+        key = (func.__name__, path, frozenset(external_references))
+        if key not in solaris_cache:
+            solaris_cache[key] = func(path, external_references=external_references)
+
+    return solaris_cache[key]
 
 
 class ValidateReferences(pyblish.api.InstancePlugin):
@@ -22,46 +46,48 @@ class ValidateReferences(pyblish.api.InstancePlugin):
                 validating.
         """
         for node in instance:
-            sg_node = usdpublishnode.get_shotgun_node(node)
-            self.validate_references(sg_node)
+            sg_node = usdpublishnode.get_context_shotgun_node(instance.context, node)
+            self.validate_references(instance.context, sg_node)
 
-    def validate_references(self, sg_node):
+    def validate_references(self, context, sg_node):
         """Run the validation on the USD stage.
 
         Args:
+            context(pyblish.Context): The pyblish context being published.
             sg_node(ShotgunNode): The SG node instance we are validating.
         """
-        in_node = sg_node.current_node.node("IN")
-        references = solaris.get_references(in_node.path())
+        # Imported here so plugin discovery doesn't pay for the USD imports
+        from rbl_pipe_houdini.utils import solaris
+
+        in_path = sg_node.current_node.node("IN").path()
+        references = _cached(context, solaris.get_references, in_path)
 
-        implicit = solaris.implicit_references(
-            in_node.path(),
+        implicit = _cached(
+            context,
+            solaris.implicit_references,
+            in_path,
             external_references=references,
         )
         # Process Houdini OP implicit refs
         for ref in implicit:
-            self.log.info(
-                "Unpublished Impicit Reference: {ref}".format(
-                    ref=ref,
-                )
-            )
+            self.log.info("Unpublished Implicit Reference: %s", ref)
 
         # Process other file refs
-        file_references = solaris.file_references(
-            in_node.path(),
+        file_references = _cached(
+            context,
+            solaris.file_references,
+            in_path,
             external_references=references,
         )
         for ref in file_references:
-            self.log.info(
-                "Unpublished File Reference: {ref}".format(
-                    ref=ref,
-                )
-            )
+            self.log.info("Unpublished File Reference: %s", ref)
 
         # Process turret refs
-        turret_references = solaris.turret_references(
-            in_node.path(),
+        turret_references = _cached(
+            context,
+            solaris.turret_references,
+            in_path,
             external_references=references,
         )
         for ref in turret_references:
-            self.log.info("Turret Reference: {ref}".format(ref=ref))
+            self.log.info("Turret Reference: %s", ref)
@@ -21,5 +21,5 @@ class DepartmentMainUSD(pyblish.api.InstancePlugin):
                 validating.
         """
         for node in instance:
-            sg_node = usdpublishnode.get_shotgun_node(node)
+            sg_node = usdpublishnode.get_context_shotgun_node(instance.context, node)
             sg_node.department_main_usd()
@@ -21,5 +21,5 @@ class RunPublishShotUSD(pyblish.api.InstancePlugin):
                 validating.
         """
         for node in instance:
-            sg_node = usdpublishnode.get_shotgun_node(node)
+            sg_node = usdpublishnode.get_context_shotgun_node(instance.context, node)
             sg_node.auto_generate_shot_usd()
@@ -8,19 +8,51 @@ import re
 
 import hou
 
-from rbl_pipe_core.util import farm
-
 from rbl_pipe_houdini.shotgun import node
+from rbl_pipe_houdini.shotgun import sgcache
 from rbl_pipe_houdini.shotgun import sgmenu
-from rbl_pipe_houdini.utils import dialog
 
 
 logger = logging.getLogger(__name__)
 
+_NON_ALNUM_RE = re.compile(r"[\W_]+")
+_NON_DIGIT_RE = re.compile(r"[^0-9]")
+
+# The hip file templates that identify an asset or shot scene
+_ASSET_HIP_TEMPLATES = frozenset(("houdini_asset_work", "houdini_asset_publish"))
+_SHOT_HIP_TEMPLATES = frozenset(("houdini_shot_work", "houdini_shot_publish"))
+
+_SEQUENCE_PATH = "{root}/{name}.{frame:0>4}.{file_type}"
+_SINGLE_PATH = "{root}/{name}.{file_type}"
+
 
 class RebellionFileCacheNode(node.ShotgunNode):
     """Cache files to working directories."""
 
+    __slots__ = (
+        "scene_template",
+        "scene_asset",
+        "scene_task",
+        "scene_step",
+        "scene_shot",
+        "scene_shot_step",
+        "scene_shot_task",
+        "context",
+        "file_type",
+        "fields",
+        "template",
+        "name_menu",
+        "file_type_menu",
+        "_fields_cache",
+        "_output_cache",
+        "_tk",
+        "_tk_templates",
+    )
+
+    # Suffix added to the template name for frame sequences
+    _SEQ_SUFFIX = "_sequence"
+    _FILE_TYPES_MENU = ("bgeo", "bgeo", "vdb", "vdb", "abc", "abc")
+
     def __init__(self, current_node):
         """Initialise the File Cache for the given node.
 
@@ -37,6 +69,10 @@ class RebellionFileCacheNode(node.ShotgunNode):
         self.context = None
         self.file_type = None
         self.fields = None
+        self._fields_cache = {}
+        self._output_cache = {}
+        self._tk = None
+        self._tk_templates = {}
 
         super(RebellionFileCacheNode, self).__init__(current_node)
 
@@ -54,39 +90,36 @@ class RebellionFileCacheNode(node.ShotgunNode):
 
     def menus_updated(self):
         """Menus updated callback."""
+        self._fields_cache.clear()
+        self._output_cache.clear()
         self.update_output_path()
 
     def refresh_context(self):
         """Refresh the context from the current hipfile."""
+        hip = hou.hipFile.path()
         sg_template = self.sg_template.template_from_path(
-            hou.hipFile.path(),
+            hip,
             templates=self.hip_templates,
         )
 
         if sg_template:
-            asset_templates = ["houdini_asset_work", "houdini_asset_publish"]
-            shot_templates = ["houdini_shot_work", "houdini_shot_publish"]
-
-            hip = hou.hipFile.path()
-
             fields = sg_template.get_fields(hip)
+            step = fields.get("Step")
+            task = "{variant}_{step}".format(
+                variant=fields.get("variant_name"),
+                step=step,
+            )
 
-            if sg_template.name in asset_templates:
+            if sg_template.name in _ASSET_HIP_TEMPLATES:
                 self.scene_template = "file_cache_asset"
                 self.scene_asset = fields.get("Asset")
-                self.scene_task = "{variant}_{step}".format(
-                    variant=fields.get("variant_name"),
-                    step=fields.get("Step"),
-                )
-                self.scene_step = fields.get("Step")
-            elif sg_template.name in shot_templates:
+                self.scene_task = task
+                self.scene_step = step
+            elif sg_template.name in _SHOT_HIP_TEMPLATES:
                 self.scene_template = "file_cache_shot"
                 self.scene_shot = fields.get("Shot")
-                self.scene_shot_step = fields.get("Step")
-                self.scene_shot_task = "{variant}_{step}".format(
-                    variant=fields.get("variant_name"),
-                    step=fields.get("Step"),
-                )
+                self.scene_shot_step = step
+                self.scene_shot_task = task
             else:
                 logger.warning("No template found for {path}".format(path=hip))
 
@@ -117,23 +150,15 @@ class RebellionFileCacheNode(node.ShotgunNode):
         """
         name = self.get_parm("name")
         file_type = self.get_parm("file_type")
-
         root = self.current_node.userData("output_root")
 
-        if self.is_sequence():
-            path = "{root}/{name}.{frame:0>4}.{file_type}".format(
-                root=root,
-                name=name,
-                frame=frame,
-                file_type=file_type,
-            )
-        else:
-            path = "{root}/{name}.{file_type}".format(
-                root=root,
-                name=name,
-                file_type=file_type,
-            )
-        return path
+        path_format = _SEQUENCE_PATH if self.is_sequence() else _SINGLE_PATH
+        return path_format.format(
+            root=root,
+            name=name,
+            frame=frame,
+            file_type=file_type,
+        )
 
     def selected_task(self):
         """Get the selected task.
@@ -144,9 +169,10 @@ class RebellionFileCacheNode(node.ShotgunNode):
         Raises:
             RuntimeError: Invalid mode set on the node.
         """
-        if self.in_asset_mode():
+        mode = self.current_mode()
+        if mode == "asset":
             return self.get_menu("task").get_selection()
-        elif self.in_shot_mode():
+        elif mode == "shot":
             return self.get_menu("shot_task").get_selection()
         else:
             raise RuntimeError("Invalid mode. Must be either asset or shot.")
@@ -176,8 +202,10 @@ class RebellionFileCacheNode(node.ShotgunNode):
         name = self.get_parm("name")
 
         if not name.isalnum():
-            pattern = re.compile(r"[\W_]+")
-            self.set_parm("name", pattern.sub("", name))
+            # Only needed for invalid names, so avoid importing it up front
+            from rbl_pipe_houdini.utils import dialog
+
+            self.set_parm("name", _NON_ALNUM_RE.sub("", name))
             dialog.display_message(
                 "Please choose a name with only alphanumeric characters, {name} is "
                 "not valid".format(name=name)
@@ -195,10 +223,30 @@ class RebellionFileCacheNode(node.ShotgunNode):
         Returns:
             (bool): If the node has a frame sequence configured.
         """
-        if self.current_node.evalParm("trange") == 0:
-            return False
-        else:
-            return True
+        # Cached alongside the menu values, so it is cleared when any parm changes
+        key = ("trange", bool)
+        if key not in self._parm_value_cache:
+            self._parm_value_cache[key] = self.current_node.evalParm("trange") != 0
+
+        return self._parm_value_cache[key]
+
+    def current_mode(self):
+        """Get the mode of the node, based on the selected template.
+
+        Returns:
+            (str): Either "asset" or "shot", or None if the template matches neither.
+        """
+        key = ("template", "mode")
+        if key not in self._parm_value_cache:
+            if self.in_asset_mode():
+                mode = "asset"
+            elif self.in_shot_mode():
+                mode = "shot"
+            else:
+                mode = None
+            self._parm_value_cache[key] = mode
+
+        return self._parm_value_cache[key]
 
     def create_file_structure(self, tk, task_id):
         """Check if the work area exists on the file system.
@@ -209,9 +257,10 @@ class RebellionFileCacheNode(node.ShotgunNode):
         """
         work_area_template = ""
 
-        if self.in_shot_mode():
+        mode = self.current_mode()
+        if mode == "shot":
             work_area_template = tk.templates["shot_work_area_houdini"]
-        elif self.in_asset_mode():
+        elif mode == "asset":
             work_area_template = tk.templates["asset_work_area_houdini"]
 
         fields = self.get_fields()
@@ -241,54 +290,125 @@ class RebellionFileCacheNode(node.ShotgunNode):
         version = 0
 
         if os.path.exists(parent):
-            folders = os.listdir(parent)
-            if folders:
-                name = self.get_parm("name")
-                file_folders = sorted([x for x in folders if name + "_" in x])
-                if file_folders:
-                    folder = file_folders[-1].split("_")
-                    version = int(re.sub("[^0-9]", "", folder[-1]))
+            prefix = "{name}_".format(name=self.get_parm("name"))
+            with os.scandir(parent) as entries:
+                for entry in entries:
+                    if prefix not in entry.name:
+                        continue
+
+                    digits = _NON_DIGIT_RE.sub("", entry.name.rsplit("_", 1)[-1])
+                    if digits:
+                        version = max(version, int(digits))
 
         return version
 
     def get_fields(self):
         """Get the fields for the shot.
 
+        The fields are cached for the current menu selections until the menus are
+        next updated.
+
         Returns:
             (dict): The fields dictionary used by SG.
         """
-        fields = {}
-
-        if self.in_asset_mode():
-            # Get menu values
-            asset_id = self.get_menu("asset").get_selection()
-            asset_step = self.get_menu("step").get_selection()
-            asset_task_id = self.get_menu("task").get_selection()
-
-            # Set values from menu values
-            fields["sg_asset_type"] = self.sg_load.asset_type_from_name(
-                self.sg_load.asset_name_from_id(int(asset_id))
-            )
-            fields["Asset"] = self.sg_load.asset_name_from_id(int(asset_id))
-            fields["Step"] = self.sg_load.step_name_from_id(
-                int(asset_step), asset_id=int(asset_id)
+        mode = self.current_mode()
+        if mode == "asset":
+            key = (
+                "asset",
+                self.get_parm_menu_id("asset"),
+                self.get_parm_menu_id("step"),
+                self.get_parm_menu_id("task"),
             )
-            fields["variant_name"] = self.sg_load.task_name_from_id(int(asset_task_id))
-        elif self.in_shot_mode():
-            # Get menu values
-            shot_id = self.get_menu("shot").get_selection()
-            shot_step_id = self.get_menu("shot_step").get_selection()
-            shot_task_id = self.get_menu("shot_task").get_selection()
-
-            # Set values from menu items
-            fields["Sequence"] = self.sg_load.sequence_name_from_shot_id(int(shot_id))
-            fields["Shot"] = self.sg_load.shot_name_from_id(int(shot_id))
-            fields["Step"] = self.sg_load.step_name_from_id(
-                int(shot_step_id), shot_id=int(shot_id)
+        elif mode == "shot":
+            key = (
+                "shot",
+                self.get_parm_menu_id("shot"),
+                self.get_parm_menu_id("shot_step"),
+                self.get_parm_menu_id("shot_task"),
             )
-            fields["variant_name"] = self.sg_load.task_name_from_id(int(shot_task_id))
+        else:
+            return {}
+
+        if key not in self._fields_cache:
+            self._fields_cache[key] = self.__load_fields(*key)
 
-        return fields
+        # The caller adds its own fields, so don't hand out the cached dictionary
+        return dict(self._fields_cache[key])
+
+    def __load_fields(self, mode, entity_id, step_id, task_id):
+        """Look up the SG fields for the given menu selections.
+
+        The fields are shared between every file cache node through the SG cache, so
+        nodes with the same selections only resolve them once.
+
+        Args:
+            mode(str): The node mode, either "asset" or "shot".
+            entity_id(int): The selected asset or shot ID.
+            step_id(int): The selected step ID.
+            task_id(int): The selected task ID.
+
+        Returns:
+            (dict): The fields dictionary used by SG.
+        """
+        if mode == "asset":
+            resolve = self.__resolve_asset_fields
+        else:
+            resolve = self.__resolve_shot_fields
+
+        return sgcache.sg_cache.get_or_set(
+            (id(self.sg_load), "file_cache_fields", mode, entity_id, step_id, task_id),
+            lambda: resolve(entity_id, step_id, task_id),
+        )
+
+    def __resolve_asset_fields(self, asset_id, step_id, task_id):
+        """Resolve the SG fields for an asset file cache.
+
+        Args:
+            asset_id(int): The selected asset ID.
+            step_id(int): The selected step ID.
+            task_id(int): The selected task ID.
+
+        Returns:
+            (dict): The fields dictionary used by SG.
+        """
+        asset_name = self.__sg_lookup("asset_name_from_id", asset_id)
+        return {
+            "sg_asset_type": self.__sg_lookup("asset_type_from_name", asset_name),
+            "Asset": asset_name,
+            "Step": self.__sg_lookup("step_name_from_id", step_id, asset_id=asset_id),
+            "variant_name": self.__sg_lookup("task_name_from_id", task_id),
+        }
+
+    def __resolve_shot_fields(self, shot_id, step_id, task_id):
+        """Resolve the SG fields for a shot file cache.
+
+        Args:
+            shot_id(int): The selected shot ID.
+            step_id(int): The selected step ID.
+            task_id(int): The selected task ID.
+
+        Returns:
+            (dict): The fields dictionary used by SG.
+        """
+        return {
+            "Sequence": self.__sg_lookup("sequence_name_from_shot_id", shot_id),
+            "Shot": self.__sg_lookup("shot_name_from_id", shot_id),
+            "Step": self.__sg_lookup("step_name_from_id", step_id, shot_id=shot_id),
+            "variant_name": self.__sg_lookup("task_name_from_id", task_id),
+        }
+
+    def __sg_lookup(self, method_name, *args, **kwargs):
+        """Call the given ShotgunLoad method through the shared SG cache.
+
+        Args:
+            method_name(str): The name of the ShotgunLoad method to call.
+            *args: Positional arguments to pass to the method.
+            **kwargs: Keyword arguments to pass to the method.
+
+        Returns:
+            The (cached) result of the ShotgunLoad method.
+        """
+        return sgcache.cached_call(self.sg_load, method_name, *args, **kwargs)
 
     def update_output_path(self, sg=True, frame=-1):
         """Update the output file path.
@@ -303,9 +423,11 @@ class RebellionFileCacheNode(node.ShotgunNode):
         Returns:
             (None)
         """
-        if farm.running_on_farm() and self.current_node.userData("output_root"):
+        if node.running_on_farm() and self.current_node.userData("output_root"):
             return self.current_node.userData("output_root")
 
+        sequence = self.is_sequence()
+
         # Only run the update on the sg side if we have to
         if sg:
 
@@ -313,14 +435,17 @@ class RebellionFileCacheNode(node.ShotgunNode):
             template_name = self.selected_template()
 
             # Set as sequence if animated template
-            if self.is_sequence():
-                template_name = "{name}_sequence".format(name=template_name)
+            if sequence:
+                template_name += self._SEQ_SUFFIX
 
             tk = self.sg_load.get_tk()
             if not tk:
                 return
-            if template_name not in tk.templates:
+            template = self.__get_tk_template(tk, template_name)
+            if template is None:
                 if not self.missing_template:
+                    from rbl_pipe_houdini.utils import dialog
+
                     msg = (
                         "{template} missing from project template. It looks like file "
                         "caching is not yet supported on this project."
@@ -331,7 +456,6 @@ class RebellionFileCacheNode(node.ShotgunNode):
                     self.missing_template = True
                 # Maybe add a node error here
                 return
-            template = tk.templates[template_name]
 
             # Set the context
             task_id = self.selected_task()
@@ -356,36 +480,66 @@ class RebellionFileCacheNode(node.ShotgunNode):
         fields["hcache_extension"] = self.get_parm("file_type")
         fields["version"] = self.get_parm("current_version")
 
-        if self.is_sequence():
+        if sequence:
             fields["SEQ"] = frame
 
-        # Set the version on the node
-        self.output_version = str(fields["version"]).zfill(3)
+        # Generate the version and publish path, reusing them if the fields match
+        key = (id(template), tuple(sorted(fields.items())))
+        cached = self._output_cache.get(key)
+        if cached is None:
+            output_path = template.apply_fields(fields)
+            cached = (
+                str(fields["version"]).zfill(3),
+                output_path,
+                os.path.dirname(output_path),
+            )
+            self._output_cache[key] = cached
+        self.output_version, self.output_path, self.output_root = cached
+
+        # Only fire the parm callbacks if the path has changed this session. The
+        # cachedUserData isn't saved with the hip file, so a reopened scene always
+        # refreshes its parms.
+        if self.current_node.cachedUserData("output_path") == self.output_path:
+            return
 
-        # Generate the publish path
-        self.output_path = template.apply_fields(fields)
-        self.output_root = os.path.dirname(self.output_path)
         self.current_node.setUserData("output_root", self.output_root)
+        self.current_node.setCachedUserData("output_path", self.output_path)
+
+        # The output path used to be saved with the hip file, remove it from older
+        # scenes
+        if self.current_node.userData("output_path") is not None:
+            self.current_node.destroyUserData("output_path")
 
         # Update output file
         self.current_node.parm("file").pressButton()
         self.current_node.parm("latest_version").pressButton()
 
-    def get_file_types_menu(self):
-        """Define the asset types we're able to write out.
+    def __get_tk_template(self, tk, template_name):
+        """Get a template from the sgtk instance, caching the lookup.
+
+        Args:
+            tk(sgtk instance): The sgtk instance for the current session.
+            template_name(str): The name of the template to get.
 
         Returns:
-            (list): A list containing the file type menu entries.
+            (sgtk.Template): The template, or None if the project doesn't define it.
         """
-        asset_types = ["bgeo", "vdb", "abc"]
+        if tk is not self._tk:
+            self._tk = tk
+            self._tk_templates = {}
+
+        if template_name not in self._tk_templates:
+            self._tk_templates[template_name] = tk.templates.get(template_name)
 
-        menu = list()
+        return self._tk_templates[template_name]
 
-        for ass in asset_types:
-            menu.append(ass)
-            menu.append(ass)
+    def get_file_types_menu(self):
+        """Define the asset types we're able to write out.
 
-        return menu
+        Returns:
+            (list): A list containing the file type menu entries.
+        """
+        return list(self._FILE_TYPES_MENU)
 
     def get_version_menu(self):
         """Generate the version menu entries.
@@ -429,17 +583,17 @@ class RebellionFileCacheNode(node.ShotgunNode):
             if node_parm == "template":
                 return self.scene_template
             elif node_parm == "asset_type":
-                return self.sg_load.asset_type_from_name(self.scene_asset)
-            elif node_parm == "asset":
-                return self.sg_load.asset_id_from_name(self.scene_asset)
+                return self.__sg_lookup("asset_type_from_name", self.scene_asset)
+
+            asset_id = self.__sg_lookup("asset_id_from_name", self.scene_asset)
+            if node_parm == "asset":
+                return asset_id
             elif node_parm == "step":
-                asset_id = self.sg_load.asset_id_from_name(self.scene_asset)
                 return self.sg_load.step_id_from_name(
                     self.scene_step,
                     asset_id=int(asset_id),
                 )
             elif node_parm == "task":
-                asset_id = self.sg_load.asset_id_from_name(self.scene_asset)
                 return self.sg_load.task_id_from_name(
                     self.scene_task,
                     asset_id=int(asset_id),
@@ -455,16 +609,16 @@ class RebellionFileCacheNode(node.ShotgunNode):
                 return self.scene_template
             elif node_parm == "sequence":
                 return self.sg_load.sequence_name_from_shot_name(self.scene_shot)
-            elif node_parm == "shot":
-                return self.sg_load.shot_id_from_name(self.scene_shot)
+
+            shot_id = self.__sg_lookup("shot_id_from_name", self.scene_shot)
+            if node_parm == "shot":
+                return shot_id
             elif node_parm == "shot_step":
-                shot_id = self.sg_load.shot_id_from_name(self.scene_shot)
                 return self.sg_load.step_id_from_name(
                     self.scene_shot_step,
                     shot_id=int(shot_id),
                 )
             elif node_parm == "shot_task":
-                shot_id = self.sg_load.shot_id_from_name(self.scene_shot)
                 return self.sg_load.task_id_from_name(
                     self.scene_shot_task,
                     shot_id=int(shot_id),
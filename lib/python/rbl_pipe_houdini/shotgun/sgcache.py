@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+
+"""Process wide cache for SG query results."""
+
+import functools
+import logging
+import threading
+import time
+
+from rbl_pipe_sg import load
+from rbl_pipe_sg import template
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 60
+
+
+class TTLCache(object):
+    """A thread safe dictionary cache where entries expire after a fixed time."""
+
+    def __init__(self, ttl=DEFAULT_TTL):
+        """Initialise the cache.
+
+        Args:
+            ttl(:obj:`float`, optional): The number of seconds entries remain valid.
+        """
+        self.ttl = ttl
+        self.lock = threading.RLock()
+        self.__data = {}
+
+    def get(self, key, default=None):
+        """Get the value for the given key, if it hasn't expired.
+
+        Args:
+            key: The cache key.
+            default(:obj:`object`, optional): The value to return on a cache miss.
+
+        Returns:
+            The cached value, or the default if it is missing or has expired.
+        """
+        with self.lock:
+            entry = self.__data.get(key)
+            if entry is None:
+                return default
+
+            expires, value = entry
+            if expires < time.monotonic():
+                del self.__data[key]
+                return default
+
+            return value
+
+    def set(self, key, value):
+        """Store a value in the cache.
+
+        Args:
+            key: The cache key.
+            value: The value to store.
+        """
+        with self.lock:
+            self.__data[key] = (time.monotonic() + self.ttl, value)
+
+    def get_or_set(self, key, factory):
+        """Get the value for the given key, creating and storing it on a cache miss.
+
+        Args:
+            key: The cache key.
+            factory(callable): Called with no arguments to create a missing value.
+
+        Returns:
+            The cached or newly created value.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.set(key, value)
+
+        return value
+
+    def pop(self, key, default=None):
+        """Remove the given key from the cache.
+
+        Args:
+            key: The cache key.
+            default(:obj:`object`, optional): The value to return if the key is missing.
+
+        Returns:
+            The value removed from the cache, or the default.
+        """
+        with self.lock:
+            entry = self.__data.pop(key, None)
+
+        if entry is None:
+            return default
+
+        return entry[1]
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        with self.lock:
+            self.__data.clear()
+
+
+_MISSING = object()
+sg_cache = TTLCache()
+
+
+def cached_call(sg_load, method_name, *args, **kwargs):
+    """Call the given ShotgunLoad method, caching the result for the cache TTL.
+
+    Args:
+        sg_load(rbl_pipe_sg.load.ShotgunLoad): The ShotgunLoad instance to query.
+        method_name(str): The name of the ShotgunLoad method to call.
+        *args: Positional arguments to pass to the method.
+        **kwargs: Keyword arguments to pass to the method. `force=True` can be passed
+            to bypass (and refresh) any cached result.
+
+    Returns:
+        The (cached) result of the ShotgunLoad method.
+    """
+    force = kwargs.pop("force", False)
+    key = (id(sg_load), method_name, args, tuple(sorted(kwargs.items())))
+
+    if force:
+        sg_cache.pop(key)
+    else:
+        value = sg_cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+    value = getattr(sg_load, method_name)(*args, **kwargs)
+    sg_cache.set(key, value)
+    return value
+
+
+@functools.lru_cache(maxsize=None)
+def get_sg_load(sg_script, sg_key):
+    """Get the ShotgunLoad instance shared by every node for the given credentials.
+
+    Args:
+        sg_script(str): The SG script to use.
+        sg_key(str): The SG key to use.
+
+    Returns:
+        (rbl_pipe_sg.load.ShotgunLoad): The ShotgunLoad instance.
+    """
+    return load.ShotgunLoad.get_instance(sg_script, sg_key)
+
+
+@functools.lru_cache(maxsize=None)
+def get_sg_template(sg_script, sg_key):
+    """Get the SGTemplate instance shared by every node for the given credentials.
+
+    Args:
+        sg_script(str): The SG script to use.
+        sg_key(str): The SG key to use.
+
+    Returns:
+        (rbl_pipe_sg.template.SGTemplate): The SG template instance.
+    """
+    return template.SGTemplate(sg_script, sg_key)
@@ -49,10 +49,7 @@ class SGMenu(nodemenu.HoudiniHDAMenu):
             (bool): Is the parm context overriden.
         """
         if self.override_parm:
-            if self.override_parm.eval() == 1:
-                return True
-            else:
-                return False
+            return super(SGMenu, self).is_overriden()
         elif self.sg_context.legacy_auto_mode():
             return False
         else:
@@ -4,11 +4,13 @@
 
 import logging
 import os
+import shutil
 
 import hou
 
 from rbl_pipe_core.util import filesystem
 
+from rbl_pipe_houdini.shotgun import node
 from rbl_pipe_houdini.shotgun import usdpublishnode
 from rbl_pipe_houdini.utils import nodes
 from rbl_pipe_houdini.utils import solaris
@@ -23,6 +25,15 @@ logger = logging.getLogger(__name__)
 class USDCompoundPublish(usdpublishnode.ShotgunUSDPublishNode):
     """Publish USD and Compound files to SG."""
 
+    __slots__ = (
+        "output_hip_path",
+        "output_alembic_path",
+        "_output_templates",
+        "_output_task_id",
+        "_child_nodes",
+        "_created_dirs",
+    )
+
     validator_ui = None
 
     def __init__(self, current_node):
@@ -34,15 +45,14 @@ class USDCompoundPublish(usdpublishnode.ShotgunUSDPublishNode):
         """
         self.output_hip_path = None
         self.output_alembic_path = None
+        self._output_templates = None
+        self._output_task_id = None
+        self._child_nodes = {}
+        self._created_dirs = set()
 
         super(USDCompoundPublish, self).__init__(current_node)
 
-        logger.info(
-            "{node_class} intitalised for {node}".format(
-                node_class=type(self).__name__,
-                node=self.current_node,
-            )
-        )
+        logger.info("%s initialised for %s", type(self).__name__, self.current_node)
 
     def get_all_templates(self, base_template):
         """
@@ -55,25 +65,13 @@ class USDCompoundPublish(usdpublishnode.ShotgunUSDPublishNode):
             (dict): A dictionary containing all of the templates relating to the given
                 base_template.
         """
-        all_templates = []
-
         if self.in_asset_mode():
-            all_templates = self.all_asset_templates
+            return self.all_asset_templates_by_usd.get(base_template, {})
         elif self.in_shot_mode():
-            all_templates = self.all_shot_templates
-        else:
-            logger.warning("Should be in either asset or shot mode.")
+            return self.all_shot_templates_by_usd.get(base_template, {})
 
-        selected_templates = [
-            templates
-            for templates in all_templates
-            if templates.get("usd") == base_template
-        ]
-
-        if selected_templates:
-            return selected_templates[0]
-        else:
-            return {}
+        logger.warning("Should be in either asset or shot mode.")
+        return {}
 
     def get_output_hip_path(self):
         """
@@ -82,6 +80,7 @@ class USDCompoundPublish(usdpublishnode.ShotgunUSDPublishNode):
         Returns:
             self.output_hip_path(str): The path to save the published Hip file to.
         """
+        self.ensure_menus()
         return self.output_hip_path
 
     def get_output_alembic_path(self):
@@ -91,6 +90,7 @@ class USDCompoundPublish(usdpublishnode.ShotgunUSDPublishNode):
         Returns:
             self.output_alembic_path(str): The path to save Alembic file to.
         """
+        self.ensure_menus()
         return self.output_alembic_path
 
     def get_output_usd_compound_path(self, compound):
@@ -108,6 +108,9 @@ class USDCompoundPublish(usdpublishnode.ShotgunUSDPublishNode):
 
     def update_output_path(self):
         """Update the output file paths based on the selected task."""
+        self._output_templates = None
+        self._output_task_id = None
+
         if self.missing_template:
             logger.debug("Skipping evaluation for missing template.")
             return
@@ -118,6 +121,7 @@ class USDCompoundPublish(usdpublishnode.ShotgunUSDPublishNode):
         if not all_templates:
             logger.warning("No templates found.")
             return
+        self._output_templates = all_templates
 
         try:
             self.sg_template.validate_template_list(all_templates.values())
@@ -131,17 +135,29 @@ class USDCompoundPublish(usdpublishnode.ShotgunUSDPublishNode):
         if not task_id:
             logger.warning("No task selected.")
             return
+        task_id = int(task_id)
+        self._output_task_id = task_id
 
         # Set the output version.
         self.output_version = self.sg_template.next_version_from_template_list(
             all_templates.values(),
-            int(task_id),
+            task_id,
         )
 
+        self.__set_output_paths(all_templates, task_id)
+        self.__refresh_output_ui()
+
+    def __set_output_paths(self, all_templates, task_id):
+        """Set the output paths for the current output version.
+
+        Args:
+            all_templates(dict): The templates for the selected base template.
+            task_id(int): The selected task ID.
+        """
         # Set the output USD path.
         self.output_path = self.sg_template.output_path_from_template(
-            template_name,
-            int(task_id),
+            all_templates.get("usd"),
+            task_id,
             self.output_version,
         )
 
@@ -151,53 +167,87 @@ class USDCompoundPublish(usdpublishnode.ShotgunUSDPublishNode):
         # Set the output Hip path.
         self.output_hip_path = self.sg_template.output_path_from_template(
             all_templates.get("publish_scene"),
-            int(task_id),
+            task_id,
             self.output_version,
         )
 
         # Set the output alembic path.
         self.output_alembic_path = self.sg_template.output_path_from_template(
             all_templates.get("alembic"),
-            int(task_id),
+            task_id,
             self.output_version,
         )
 
-        # Clean-up the UI.
-        refresh_list = []
-        refresh_list.append(self.current_node.parm("output_version").path())
-        refresh_list.append(self.current_node.parm("output_root").path())
-        refresh_list.append(self.current_node.parm("lopoutput").path())
+    def __refresh_output_ui(self):
+        """Force the UI to show the updated output parms."""
+        refresh_list = [
+            self._parm(parm_name)
+            for parm_name in ("output_version", "output_root", "lopoutput")
+        ]
         nodes.force_ui_update(refresh_list)
 
-    def __write_publish_scene(self):
-        """Write the publish scene file to disk."""
-        current_hip_path = hou.hipFile.path()
-        filesystem.create_directory(os.path.dirname(self.output_hip_path))
-        hou.hipFile.save(file_name=self.output_hip_path, save_to_recent_files=False)
-        logger.info(
-            "Publish scene file written to {path}".format(
-                path=self.output_hip_path,
-            )
-        )
-        hou.hipFile.setName(current_hip_path)
+    def __child_node(self, node_path):
+        """Get the (cached) node at the given path inside the current node.
+
+        Args:
+            node_path(str): The path of the node relative to the current node.
+
+        Returns:
+            (hou.Node): The node, or None if it doesn't exist.
+        """
+        if node_path not in self._child_nodes:
+            self._child_nodes[node_path] = self.current_node.node(node_path)
+
+        return self._child_nodes[node_path]
+
+    def __create_directory(self, directory):
+        """Create the given directory, unless it was already created by this publish.
+
+        Args:
+            directory(str): The directory to create.
+        """
+        if directory in self._created_dirs:
+            return
+
+        filesystem.create_directory(directory)
+
+        # Creating the directory also creates all of its parents.
+        while directory and directory not in self._created_dirs:
+            self._created_dirs.add(directory)
+            parent = os.path.dirname(directory)
+            if parent == directory:
+                break
+            directory = parent
+
+    def __write_publish_scene(self, work_path):
+        """Write the publish scene file to disk.
+
+        The scene has just been saved as the work file, so that is copied rather than
+        serialising the scene a second time. It is copied rather than linked so that
+        later saves of the work file can't modify the published scene.
+
+        Args:
+            work_path(str): The path to the work file saved for this publish.
+        """
+        self.__create_directory(os.path.dirname(self.output_hip_path))
+        shutil.copyfile(work_path, self.output_hip_path)
+        logger.info("Publish scene file written to %s", self.output_hip_path)
 
     def __write_alembic(self):
         """Write the publish alembic to disk."""
-        abc_rop_node = self.current_node.node("ALEMBIC_OUT/sopnet1/EDIT/ABC_OUT")
+        abc_rop_node = self.__child_node("ALEMBIC_OUT/sopnet1/EDIT/ABC_OUT")
         abc_rop_node.parm("execute").pressButton()
-        logger.info(
-            "Alembic file written to {path}".format(path=self.output_alembic_path)
-        )
+        logger.info("Alembic file written to %s", self.output_alembic_path)
 
     def __write_usd(self):
         """Write the publish USD (and compounds) to disk."""
-        lop_node = self.current_node.node("IN")
+        lop_node = self.__child_node("IN")
         solaris.create_usd_directories(lop_node.path(), self.output_path)
 
         # Write the USD file(s).
-        usd_rop = self.current_node.node("USD_OUT")
+        usd_rop = self.__child_node("USD_OUT")
         usd_rop.parm("execute").pressButton()
-        logger.info("USD file written to {path}".format(path=self.output_path))
+        logger.info("USD file written to %s", self.output_path)
 
     def __get_compound_path(self, parm_name):
         """
@@ -210,6 +260,11 @@ class USDCompoundPublish(usdpublishnode.ShotgunUSDPublishNode):
             compound_path(str): The path for the given compound.
         """
         compound_path = self.current_node.evalParm(parm_name)
+
+        # The check only warns the artist, so skip the file system access on the farm.
+        if node.running_on_farm():
+            return compound_path
+
         try:
             is_file = os.path.isfile(compound_path)
         except Exception as e:
@@ -226,14 +281,18 @@ class USDCompoundPublish(usdpublishnode.ShotgunUSDPublishNode):
 
     def usd_publish(self):
         """Write the USD and associated files and publish it to shotgun."""
+        # Directories may have been removed since the last publish.
+        self._created_dirs.clear()
+
         # Make sure output paths are up to date.
         self.update_output_path()
 
-        # Grab the templates.
-        template_name = self.selected_template()
-        all_templates = self.get_all_templates(template_name)
+        # Reuse the templates and task resolved by update_output_path.
+        all_templates = self._output_templates
+        if all_templates is None:
+            all_templates = self.get_all_templates(self.selected_template())
 
-        task_id = self.selected_task()
+        task_id = int(self._output_task_id or self.selected_task())
 
         # Get the publish comment.
         comment = self.current_node.evalParm("comment")
@@ -243,14 +302,11 @@ class USDCompoundPublish(usdpublishnode.ShotgunUSDPublishNode):
                 version=self.output_version,
             )
 
-        # Get the context.
-        task_id = self.selected_task()
-
         # Create the publish object.
         sg_publish = publish.SGPublish(
             self.sg_script,
             self.sg_key,
-            task_id=int(task_id),
+            task_id=task_id,
             version=self.output_version,
             description=comment,
         )
@@ -258,16 +314,21 @@ class USDCompoundPublish(usdpublishnode.ShotgunUSDPublishNode):
         # Save a new work file version.
         work_path = self.sg_template.output_path_from_template(
             all_templates.get("work_scene"),
-            int(task_id),
+            task_id,
             self.output_version,
         )
-        filesystem.create_directory(os.path.dirname(work_path))
+        self.__create_directory(os.path.dirname(work_path))
         hou.hipFile.save(file_name=work_path)
-        logger.info("Work scene file written to {path}".format(path=work_path))
+        logger.info("Work scene file written to %s", work_path)
+
+        # The scene, Alembic and USD writes are deliberately run in sequence. HOM
+        # isn't thread safe, and background ROP renders cook a copy of the scene in
+        # a separate process with no way to wait on them before the publish is
+        # registered.
 
         # Save a publish file version.
         if self.current_node.evalParm("include_hip"):
-            self.__write_publish_scene()
+            self.__write_publish_scene(work_path)
             sg_publish.add_child_publish_item(
                 self.output_hip_path,
                 "Houdini Scene",
@@ -306,7 +367,7 @@ class USDCompoundPublish(usdpublishnode.ShotgunUSDPublishNode):
 
         # Run the publish.
         result = sg_publish.run_publish()
-        logger.info("Publish Complete. ID: {version}.".format(version=result))
+        logger.info("Publish Complete. ID: %s.", result)
         self.update_output_path()
 
 
@@ -6,9 +6,8 @@ import logging
 import os
 import time
 
-from rbl_pipe_core.util import farm
-
 from rbl_pipe_houdini.shotgun import node
+from rbl_pipe_houdini.shotgun import sgcache
 
 from rbl_pipe_usd.resolve import ar
 from rbl_pipe_usd.resolve import uribuilder
@@ -20,6 +19,12 @@ logger = logging.getLogger(__name__)
 class ShotgunUSDNode(node.ShotgunNode):
     """Shotgun USD Node - USD / Turret support."""
 
+    __slots__ = (
+        "_farm_uri",
+        "_farm_prim_path",
+        "_uri_builder",
+    )
+
     def __init__(self, current_node):
         """
         Initialise based on the given node.
@@ -27,14 +32,26 @@ class ShotgunUSDNode(node.ShotgunNode):
         Args:
             current_node(hou.Node): The Houdini node to intialise based on.
         """
+        # The farm URI and prim path are read from the node's userData once.
+        self._farm_uri = None
+        self._farm_prim_path = None
+        self._uri_builder = None
+
         super(ShotgunUSDNode, self).__init__(current_node)
-        self.uri_builder = uribuilder.UriBuilder(self.sg_script, self.sg_key)
 
-        logger.info(
-            "ShotgunUSDNode intitalised for {node}".format(
-                node=self.current_node,
-            )
-        )
+        logger.info("ShotgunUSDNode initialised for %s", self.current_node)
+
+    @property
+    def uri_builder(self):
+        """Get the URI builder, creating it on first use.
+
+        Returns:
+            (rbl_pipe_usd.resolve.uribuilder.UriBuilder): The URI builder instance.
+        """
+        if self._uri_builder is None:
+            self._uri_builder = uribuilder.UriBuilder(self.sg_script, self.sg_key)
+
+        return self._uri_builder
 
     def get_task(self):
         """
@@ -58,8 +75,10 @@ class ShotgunUSDNode(node.ShotgunNode):
         Raises:
             RuntimeError: If we aren't in either asset mode or shot mode.
         """
-        if farm.running_on_farm():
-            return self.current_node.userData("uri") or ""
+        if node.running_on_farm():
+            if self._farm_uri is None:
+                self._farm_uri = self.current_node.userData("uri") or ""
+            return self._farm_uri
 
         if self.in_asset_mode():
             uri = self.generate_asset_uri()
@@ -109,8 +128,10 @@ class ShotgunUSDNode(node.ShotgunNode):
         Raises:
             RuntimeError: If we aren't in either asset mode or shot mode.
         """
-        if farm.running_on_farm():
-            return self.current_node.userData("prim_path") or ""
+        if node.running_on_farm():
+            if self._farm_prim_path is None:
+                self._farm_prim_path = self.current_node.userData("prim_path") or ""
+            return self._farm_prim_path
 
         prim_path = "/source"
 
@@ -126,10 +147,15 @@ class ShotgunUSDNode(node.ShotgunNode):
             step = self.get_menu("shot_step").get_selection()
             task = self.get_menu("shot_task").get_selection()
             if shot and step and task:
+                shot_name, step_name, task_name = self.__shot_names(
+                    int(shot),
+                    int(step),
+                    int(task),
+                )
                 prim_path = "/{shot}_{step}_{task}".format(
-                    shot=self.sg_load.shot_name_from_id(int(shot)),
-                    step=self.sg_load.step_name_from_id(int(step), shot_id=int(shot)),
-                    task=self.sg_load.task_name_from_id(int(task)),
+                    shot=shot_name,
+                    step=step_name,
+                    task=task_name,
                 )
         else:
             raise RuntimeError("Invalid mode. Must be either asset or shot.")
@@ -137,6 +163,28 @@ class ShotgunUSDNode(node.ShotgunNode):
         self.current_node.setUserData("prim_path", prim_path)
         return prim_path
 
+    def __shot_names(self, shot_id, step_id, task_id):
+        """Get the shot, step and task names for the given IDs.
+
+        The names are resolved together and cached as one entry in the SG cache.
+
+        Args:
+            shot_id(int): The ID of the shot.
+            step_id(int): The ID of the step.
+            task_id(int): The ID of the task.
+
+        Returns:
+            (tuple): The shot name, step name and task name.
+        """
+        return sgcache.sg_cache.get_or_set(
+            (id(self.sg_load), "shot_names", shot_id, step_id, task_id),
+            lambda: (
+                self.sg_load.shot_name_from_id(shot_id),
+                self.sg_load.step_name_from_id(step_id, shot_id=shot_id),
+                self.sg_load.task_name_from_id(task_id),
+            ),
+        )
+
     def refresh_cache(self):
         """Refresh the turret cache.
 
@@ -157,6 +205,9 @@ class ShotgunUSDNode(node.ShotgunNode):
 
         # Clear cached uri used in details label
         self.current_node.destroyCachedUserData("uri")
+        self.current_node.destroyCachedUserData("resolved_usd_path")
+        self._farm_uri = None
+        self._farm_prim_path = None
 
         # update the version menu
         self.update_version_menu(force=True)
@@ -164,7 +215,8 @@ class ShotgunUSDNode(node.ShotgunNode):
     def get_usd_path(self):
         """Get the current real path for the URI being loaded.
 
-        This is cached to the node.
+        This is cached to the node, keyed by the URI and the turret cache time so that
+        refreshing the cache also resolves the URI again.
 
         Returns:
             resolved_path(str): The path to the current USD URI.
@@ -177,7 +229,13 @@ class ShotgunUSDNode(node.ShotgunNode):
         else:
             uri = ""
 
+        key = (uri, os.environ.get("USD_ASSET_TIME"))
+        cached = self.current_node.cachedUserData("resolved_usd_path")
+        if cached and cached[0] == key:
+            return cached[1]
+
         resolved_path = ar.resolve_path(uri)
+        self.current_node.setCachedUserData("resolved_usd_path", (key, resolved_path))
         return resolved_path
 
 
@@ -7,9 +7,6 @@ import os
 
 import hou
 
-import pyblish.api
-
-from rbl_pipe_houdini.pyblish import houdinipyblishui
 from rbl_pipe_houdini.shotgun import usdnode
 from rbl_pipe_houdini.utils import dialog
 from rbl_pipe_houdini.utils import solaris
@@ -17,20 +14,40 @@ from rbl_pipe_houdini.utils import solaris
 from rbl_pipe_sg import publish
 from rbl_pipe_sg.template import SgtkTemplateNotFoundException
 
-from rbl_pipe_shotbuild_core.models import DataStore
-from rbl_pipe_shotbuild_core.utils import import_shot_data_from_usd
 
-from rbl_pipe_usd.build import assetusd
-from rbl_pipe_usd.build import shotusd
+logger = logging.getLogger(__name__)
 
+_ASSET_HIP_TEMPLATES = frozenset(("houdini_asset_work", "houdini_asset_publish"))
+_SHOT_HIP_TEMPLATES = frozenset(("houdini_shot_work", "houdini_shot_publish"))
 
-logger = logging.getLogger(__name__)
+# The pyblish plugins shipped with this package, resolved once at import time
+_PLUGINS_ROOT = os.path.join(
+    os.path.abspath(__file__).rsplit("/lib/python", 1)[0],
+    "lib/python/rbl_pipe_houdini/shotgun",
+)
+_PLUGINS_DIR = os.path.join(_PLUGINS_ROOT, "pyblish_plugins")
+_ASSET_PLUGINS_DIR = os.path.join(_PLUGINS_ROOT, "pyblish_asset_plugins")
+_SHOT_PLUGINS_DIR = os.path.join(_PLUGINS_ROOT, "pyblish_shot_plugins")
 
 
 class ShotgunUSDPublishNode(usdnode.ShotgunUSDNode):
     """Publish USD to Shotgun."""
 
+    __slots__ = (
+        "_type_name",
+        "scene_template",
+        "scene_asset",
+        "scene_task",
+        "scene_step",
+        "scene_shot",
+        "scene_shot_step",
+        "scene_shot_task",
+        "context",
+        "_hip_template_cache",
+    )
+
     publish_node = None
+    publish_node_type_name = None
     validator_ui = None
 
     def __init__(self, current_node):
@@ -39,6 +56,7 @@ class ShotgunUSDPublishNode(usdnode.ShotgunUSDNode):
         Args:
             current_node(hou.Node): The Houdini node to initialise the class with.
         """
+        self._type_name = None
         self.scene_template = None
         self.scene_asset = None
         self.scene_task = None
@@ -47,14 +65,7 @@ class ShotgunUSDPublishNode(usdnode.ShotgunUSDNode):
         self.scene_shot_step = None
         self.scene_shot_task = None
         self.context = None
-        self.hip_asset_templates = [
-            "houdini_asset_work",
-            "houdini_asset_publish",
-        ]
-        self.hip_shot_templates = [
-            "houdini_shot_work",
-            "houdini_shot_publish",
-        ]
+        self._hip_template_cache = (None, None)
 
         super(ShotgunUSDPublishNode, self).__init__(current_node)
 
@@ -82,24 +93,41 @@ class ShotgunUSDPublishNode(usdnode.ShotgunUSDNode):
         # If the template has changed, update the save style
         if selected_template != self.context:
             if self.in_asset_mode():
-                self.current_node.parm("savestyle").set("flattenalllayers")
+                self._parm("savestyle").set("flattenalllayers")
             elif self.in_shot_mode():
-                self.current_node.parm("savestyle").set("flattenimplicitlayers")
+                self._parm("savestyle").set("flattenimplicitlayers")
             else:
                 raise RuntimeError("Must be in either asset or shot mode.")
             self.context = selected_template
 
+    def __hip_template(self):
+        """Get the SG template matching the current hip file.
+
+        The match is cached until the hip file path changes.
+
+        Returns:
+            (tank.template.TemplatePath): The template for the hip file, or None if
+                the hip file doesn't match any of the hip templates.
+        """
+        hip = hou.hipFile.path()
+        cached_hip, sg_template = self._hip_template_cache
+        if cached_hip != hip:
+            sg_template = self.sg_template.template_from_path(
+                hip,
+                templates=self.hip_templates,
+            )
+            self._hip_template_cache = (hip, sg_template)
+
+        return sg_template
+
     def hip_asset_mode(self):
         """Check if we are in asset mode.
 
         Returns:
             (bool): Is the scene file an asset scene.
         """
-        sg_template = self.sg_template.template_from_path(
-            hou.hipFile.path(),
-            templates=self.hip_templates,
-        )
-        if sg_template and sg_template.name in self.hip_asset_templates:
+        sg_template = self.__hip_template()
+        if sg_template and sg_template.name in _ASSET_HIP_TEMPLATES:
             return True
 
         return False
@@ -110,11 +138,8 @@ class ShotgunUSDPublishNode(usdnode.ShotgunUSDNode):
         Returns:
             (bool): Is the scene file a shot scene.
         """
-        sg_template = self.sg_template.template_from_path(
-            hou.hipFile.path(),
-            templates=self.hip_templates,
-        )
-        if sg_template and sg_template.name in self.hip_shot_templates:
+        sg_template = self.__hip_template()
+        if sg_template and sg_template.name in _SHOT_HIP_TEMPLATES:
             return True
 
         return False
@@ -125,6 +150,7 @@ class ShotgunUSDPublishNode(usdnode.ShotgunUSDNode):
         Returns:
             self.output_version(str): The output version for the current node.
         """
+        self.ensure_menus()
         return self.output_version
 
     def get_output_root(self):
@@ -133,6 +159,7 @@ class ShotgunUSDPublishNode(usdnode.ShotgunUSDNode):
         Returns:
             self.output_root(str): The output root for the current node.
         """
+        self.ensure_menus()
         return self.output_root
 
     def get_output_path(self):
@@ -141,6 +168,7 @@ class ShotgunUSDPublishNode(usdnode.ShotgunUSDNode):
         Returns:
             self.output_path(str): The output path for the current node.
         """
+        self.ensure_menus()
         return self.output_path
 
     def update_output_path(self):
@@ -177,9 +205,12 @@ class ShotgunUSDPublishNode(usdnode.ShotgunUSDNode):
         )
         self.output_root = os.path.dirname(self.output_path)
 
-        self.current_node.parm("output_version").pressButton()
-        self.current_node.parm("output_root").pressButton()
-        self.current_node.parm("lopoutput").pressButton()
+        self.__refresh_output_parms()
+
+    def __refresh_output_parms(self):
+        """Force the output parms to update in the UI."""
+        for parm_name in ("output_version", "output_root", "lopoutput"):
+            self._parm(parm_name).pressButton()
 
     def auto_generate_asset_usd(self):
         """Automatically generate and publish the asset USD if it doesn't already exist.
@@ -187,7 +218,9 @@ class ShotgunUSDPublishNode(usdnode.ShotgunUSDNode):
         Raises:
             RuntimeError: Cannot run when not in asset mode.
         """
-        task_id = int(self.selected_task())
+        from rbl_pipe_usd.build import assetusd
+
+        task_id = self.selected_task_id()
 
         if not self.in_asset_mode():
             raise RuntimeError("Can only be run when operating in asset mode.")
@@ -207,16 +240,19 @@ class ShotgunUSDPublishNode(usdnode.ShotgunUSDNode):
         Raises:
             RuntimeError: Cannot run when not in shot mode.
         """
-        task_id = int(self.selected_task())
+        from rbl_pipe_usd.build import shotusd
+
+        task_id = self.selected_task_id()
 
         if not self.in_shot_mode():
             raise RuntimeError("Can only be run when operating in shot mode.")
-            shot_id = self.sg_load.shot_id_from_task_id(task_id)
-            shotusd.publish_shot_usd(
-                shot_id,
-                self.sg_script,
-                self.sg_key,
-            )
+
+        shot_id = self.sg_load.shot_id_from_task_id(task_id)
+        shotusd.publish_shot_usd(
+            shot_id,
+            self.sg_script,
+            self.sg_key,
+        )
 
     def department_main_usd(self):
         """Check if the department main USD has been published.
@@ -224,8 +260,12 @@ class ShotgunUSDPublishNode(usdnode.ShotgunUSDNode):
         Raises:
             RuntimeError: The department main USD couldn't be found.
         """
+        from rbl_pipe_shotbuild_core.models import DataStore
+        from rbl_pipe_shotbuild_core.utils import import_shot_data_from_usd
+        from rbl_pipe_usd.build import shotusd
+
         # Get the context.
-        task_id = int(self.selected_task())
+        task_id = self.selected_task_id()
 
         shot_id = self.sg_load.shot_id_from_task_id(task_id)
         shotusd.publish_shot_usd(
@@ -274,10 +314,10 @@ class ShotgunUSDPublishNode(usdnode.ShotgunUSDNode):
             )
 
         if main_task:
-            leaf_tasks = [
-                main_task_dep.depends_to for main_task_dep in main_task.dependencies
-            ]
-            if task_id not in [task.id for task in leaf_tasks]:
+            leaf_task_ids = {
+                main_task_dep.depends_to.id for main_task_dep in main_task.dependencies
+            }
+            if task_id not in leaf_task_ids:
                 raise RuntimeError(
                     "Publishes to this task will not be included in {step}_main, "
                     "unless Blueprint is updated.".format(
@@ -294,43 +334,56 @@ class ShotgunUSDPublishNode(usdnode.ShotgunUSDNode):
                 )
             )
 
+    def node_type_name(self):
+        """Get the name of the node type, caching it after the first lookup.
+
+        Returns:
+            (str): The node type name.
+        """
+        if self._type_name is None:
+            self._type_name = self.current_node.type().name()
+
+        return self._type_name
+
     def run_publish(self):
         """Handle any referenced files whilst running the publish.
 
         Raises:
             RuntimeError: Invalid mode found on the node.
         """
-        # Make sure we don't already have plugins loaded from elsewhere
-        pyblish.api.deregister_all_paths()
-        pyblish.api.deregister_all_plugins()
+        import pyblish.api
 
-        # Make the node to be published available for collection
-        ShotgunUSDPublishNode.publish_node = self.current_node
+        from rbl_pipe_houdini.pyblish import houdinipyblishui
 
-        # Register the application host
-        pyblish.api.register_host("houdini")
-
-        # Register the plugins
-        python_root = os.path.abspath(__file__).rsplit("/lib/python", 1)[0]
-        plugins_root = os.path.join(
-            python_root,
-            "lib/python/rbl_pipe_houdini/shotgun",
-        )
-        plugins = os.path.join(plugins_root, "pyblish_plugins")
-        pyblish.api.register_plugin_path(plugins)
         if self.in_asset_mode():
             # Asset specific plugins
-            pyblish.api.register_plugin_path(
-                os.path.join(plugins_root, "pyblish_asset_plugins")
-            )
+            plugin_paths = [_PLUGINS_DIR, _ASSET_PLUGINS_DIR]
         elif self.in_shot_mode():
             # Shot specific plugins
-            pyblish.api.register_plugin_path(
-                os.path.join(plugins_root, "pyblish_shot_plugins")
-            )
+            plugin_paths = [_PLUGINS_DIR, _SHOT_PLUGINS_DIR]
         else:
             raise RuntimeError("Should be either in asset or shot mode.")
 
+        # Make the node to be published available for collection
+        ShotgunUSDPublishNode.publish_node = self.current_node
+        ShotgunUSDPublishNode.publish_node_type_name = self.node_type_name()
+
+        # Register the application host
+        pyblish.api.register_host("houdini")
+
+        # Register the plugins, unless they are already the only ones registered (ie.
+        # the last publish was run in the same mode).
+        if (
+            pyblish.api.registered_paths() != plugin_paths
+            or pyblish.api.registered_plugins()
+        ):
+            # Make sure we don't already have plugins loaded from elsewhere
+            pyblish.api.deregister_all_paths()
+            pyblish.api.deregister_all_plugins()
+
+            for plugin_path in plugin_paths:
+                pyblish.api.register_plugin_path(plugin_path)
+
         # Launch the UI
         validator = houdinipyblishui.HoudiniPyblishUI(
             title="USD Publish Validation",
@@ -346,14 +399,16 @@ class ShotgunUSDPublishNode(usdnode.ShotgunUSDNode):
         # Get the context.
         task_id = self.selected_task()
 
+        publish_path = self.current_node.evalParm("lopoutput")
+
         # Get the publish comment
         comment = None
-        comment_parm = self.current_node.parm("comment")
+        comment_parm = self._parm("comment")
         if comment_parm:
             comment = comment_parm.evalAsString()
         if not comment:
             comment = "{name} version {version}.".format(
-                name=os.path.basename(self.current_node.evalParm("lopoutput")),
+                name=os.path.basename(publish_path),
                 version=self.output_version,
             )
 
@@ -367,7 +422,6 @@ class ShotgunUSDPublishNode(usdnode.ShotgunUSDNode):
         )
 
         # First create any directories required with the correct permissions
-        publish_path = self.current_node.evalParm("lopoutput")
         lop_node = self.current_node.node("IN")
         solaris.create_usd_directories(lop_node.path(), publish_path)
 
@@ -377,7 +431,7 @@ class ShotgunUSDPublishNode(usdnode.ShotgunUSDNode):
         logger.info("USD file written to {path}".format(path=publish_path))
 
         sg_publish.add_main_publish_item(
-            self.current_node.evalParm("lopoutput"),
+            publish_path,
             "USD Scene",
         )
 
@@ -388,55 +442,48 @@ class ShotgunUSDPublishNode(usdnode.ShotgunUSDNode):
 
     def run_validate(self):
         """Run the validation on the USD stage."""
-        in_node = self.current_node.node("IN")
-        references = solaris.get_references(in_node.path())
+        in_path = self.current_node.node("IN").path()
+        references = solaris.get_references(in_path)
 
         severity = hou.severityType.Message
         buttons = ("OK",)
 
         if len(references) == 0:
-            message = "USD file to be created will contain no external file references."
+            parts = ["USD file to be created will contain no external file references."]
         else:
-            message = "USD file to be created will contain external file references."
+            parts = ["USD file to be created will contain external file references."]
 
-        # Process Houdini OP implicit refs
-        op_refs = solaris.implicit_references(
-            in_node.path(),
+        classified = solaris.classify_references(
+            in_path,
             external_references=references,
         )
+
+        # Process Houdini OP implicit refs
+        op_refs = classified["implicit"]
         if len(op_refs) > 0:
-            message += (
+            parts.append(
                 "\n\nWarning - Houdini Implicit References (Should be published):"
             )
             severity = hou.severityType.Warning
 
-        for i in op_refs:
-            message += "\n{ref}".format(ref=i)
+        parts.extend("\n{}".format(ref) for ref in op_refs)
 
         # Process other file refs
-        other_refs = solaris.file_references(
-            in_node.path(),
-            external_references=references,
-        )
+        other_refs = classified["file"]
         if len(other_refs) > 0:
-            message += "\n\nWarning - File References (Should be published):"
+            parts.append("\n\nWarning - File References (Should be published):")
             severity = hou.severityType.Warning
 
-        for i in other_refs:
-            message += "\n{ref}".format(ref=i)
+        parts.extend("\n{}".format(ref) for ref in other_refs)
 
         # Process turret refs
-        turret_refs = solaris.turret_references(
-            in_node.path(),
-            external_references=references,
-        )
+        turret_refs = classified["turret"]
         if len(turret_refs) > 0:
-            message += "\n\nTurret References:"
-        for i in turret_refs:
-            message += "\n{ref}".format(ref=i)
+            parts.append("\n\nTurret References:")
+        parts.extend("\n{}".format(ref) for ref in turret_refs)
 
         dialog.display_message(
-            message,
+            "".join(parts),
             buttons=buttons,
             severity=severity,
             title="USD Publish Validation",
@@ -444,7 +491,7 @@ class ShotgunUSDPublishNode(usdnode.ShotgunUSDNode):
 
     def update_mode(self):
         """Handle the case of the mode menu changing."""
-        mode = self.current_node.parm("mode")
+        mode = self._parm("mode")
         if mode and mode.evalAsString() == "auto":
             self.update_all_menus(force=True)
 
@@ -456,9 +503,9 @@ class ShotgunUSDPublishNode(usdnode.ShotgunUSDNode):
         Args:
             force(bool): Should the update be forced.
         """
-        before = self.current_node.parm("template").eval()
+        before = self._parm("template").eval()
         super(ShotgunUSDPublishNode, self).update_templates_menu(force)
-        if self.current_node.parm("template").eval() != before:
+        if self._parm("template").eval() != before:
             self.update_save_default()
 
 
@@ -477,6 +524,30 @@ def get_shotgun_node(current_node):
     return ShotgunUSDPublishNode.get_shotgun_node(current_node)
 
 
+def get_context_shotgun_node(context, current_node):
+    """Load the ShotgunUSDPublishNode for a node, cached on the pyblish context.
+
+    The instances are collected once by CollectPublishNode, so the plugins that run
+    after it don't each need to look them up from the cachedUserData.
+
+    Args:
+        context(pyblish.Context): The pyblish context being published.
+        current_node(hou.Node): The node to get the SG class instance for.
+
+    Returns:
+        (rbl_pipe_houdini.shotgun.usdpublishnode.ShotgunUSDPublishNode): The SG class
+            instance for the given node.
+    """
+    sg_node_cache = context.data.setdefault("sg_node_cache", {})
+    path = current_node.path()
+    sg_node = sg_node_cache.get(path)
+    if sg_node is None:
+        sg_node = get_shotgun_node(current_node)
+        sg_node_cache[path] = sg_node
+
+    return sg_node
+
+
 def initialise(current_node, publish=False):
     """Create a new instance of ShotgunUSDPublishNode.
 
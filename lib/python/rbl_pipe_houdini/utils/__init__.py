@@ -1,16 +1,21 @@
 #!/usr/bin/env python
 
+import functools
 import os
 
 from rbl_pipe_core.util import config
 
+_BASEDIR = os.path.abspath(__file__).rsplit("/lib/python", 1)[0]
+_CONFIG_FILE = os.path.join(_BASEDIR, "config", "rbl_pipe_houdini.json")
 
+
+@functools.lru_cache(maxsize=1)
 def get_config():
     """Load config file for this repository.
 
+    The config is only loaded once per process.
+
     Returns:
         (rbl_pipe_core.util.config.Config): The config object for the repository.
     """
-    basedir = os.path.abspath(__file__).rsplit("/lib/python", 1)[0]
-    config_file = os.path.join(basedir, "config", "rbl_pipe_houdini.json")
-    return config.ConfigRepo.get(config_file)
+    return config.ConfigRepo.get(_CONFIG_FILE)
@@ -2,7 +2,10 @@
 
 """Cross copies nodes from current scene to library."""
 
+import copy
+import functools
 import getpass
+import hashlib
 import json
 import logging
 import os
@@ -25,11 +28,39 @@ user = getpass.getuser()
 # Project
 show = get_project()
 
-
+# Directories that have already been created this session
+_ENSURED_DIRS = set()
+
+# Library json contents keyed by path, along with the file stats they were read at
+_JSON_CACHE = {}
+
+# Digests of the library json we last wrote, keyed by path, with the file stats
+_JSON_DIGESTS = {}
+
+_MONTHS = (
+    "",
+    "Jan",
+    "Feb",
+    "Mar",
+    "Apr",
+    "May",
+    "Jun",
+    "Jul",
+    "Aug",
+    "Sep",
+    "Oct",
+    "Nov",
+    "Dec",
+)
+
+
+@functools.lru_cache(maxsize=None)
 def get_category_library_path(category, show):
     """
     Get the path for a specific library.
 
+    The path is only resolved once for each category and show.
+
     Args:
         category(str): The node type category
         show(str): Project code
@@ -85,7 +116,13 @@ def ensure_dir(filepath):
         filepath(str): Directory filepath
     """
     directory = os.path.dirname(filepath)
-    filesystem.create_directory(directory)
+    if directory in _ENSURED_DIRS:
+        return
+
+    # A single stat is enough when the directory already exists.
+    if not os.path.isdir(directory):
+        filesystem.create_directory(directory)
+    _ENSURED_DIRS.add(directory)
 
 
 def get_category_json(category, show):
@@ -120,11 +157,42 @@ def write_json_dictionary(dictionary, filepath):
     """
     ensure_dir(filepath)
 
+    payload = json.dumps(dictionary, sort_keys=True, indent=4).encode("utf-8")
+    digest = hashlib.blake2b(payload, digest_size=16).digest()
+
+    # Skip the write if we already wrote the same contents and nobody has changed
+    # the file since.
+    written = _JSON_DIGESTS.get(filepath)
+    if written and written[1] == digest:
+        try:
+            unchanged = _file_signature(filepath) == written[0]
+        except OSError:
+            unchanged = False
+        if unchanged:
+            return
+
+    # Write to a temporary file first so a failed write can't leave a truncated
+    # library behind.
+    temp_filepath = "{path}.{pid}.tmp".format(path=filepath, pid=os.getpid())
+
     old_mask = os.umask(0o007)
     try:
-        with open(filepath, "w") as fp:
-            json.dump(dictionary, fp, sort_keys=True, indent=4)
+        with open(temp_filepath, "wb") as fp:
+            fp.write(payload)
+        try:
+            os.replace(temp_filepath, filepath)
+        except PermissionError:
+            # Replacing a file owned by someone else isn't allowed in sticky shared
+            # directories, so fall back to writing the file in place.
+            os.remove(temp_filepath)
+            with open(filepath, "wb") as fp:
+                fp.write(payload)
     except Exception as e:
+        # Don't leave the partial temporary file behind in the library.
+        try:
+            os.remove(temp_filepath)
+        except OSError:
+            pass
         message = "ERROR: Failed to create json: '{}': {}".format(
             filepath,
             e,
@@ -132,10 +200,26 @@ def write_json_dictionary(dictionary, filepath):
         raise RuntimeError(message)
     else:
         logger.info("Directory created: {path}".format(path=filepath))
+        signature = _file_signature(filepath)
+        _JSON_CACHE[filepath] = (signature, copy.deepcopy(dictionary))
+        _JSON_DIGESTS[filepath] = (signature, digest)
     finally:
         os.umask(old_mask)
 
 
+def _file_signature(filepath):
+    """Get the modification time and size of the given file.
+
+    Args:
+        filepath(str): The file to stat.
+
+    Returns:
+        (tuple): The modification time in nanoseconds and the size of the file.
+    """
+    stat = os.stat(filepath)
+    return stat.st_mtime_ns, stat.st_size
+
+
 def read_json_dictionary(filepath):
     """Extract the dictionary from a json file.
 
@@ -145,10 +229,39 @@ def read_json_dictionary(filepath):
     Returns:
         d(dict): Dictionary from json file
     """
-    with open(filepath) as fh:
-        jsondata = fh.read()
+    # The library is only re-read if it has changed since we last read or wrote it.
+    signature = _file_signature(filepath)
+    cached = _JSON_CACHE.get(filepath)
+    if cached and cached[0] == signature:
+        return copy.deepcopy(cached[1])
 
-    return json.loads(jsondata)
+    with open(filepath, "rb") as fh:
+        dictionary = json.load(fh)
+
+    _JSON_CACHE[filepath] = (signature, copy.deepcopy(dictionary))
+    return dictionary
+
+
+def format_time(timestamp):
+    """Format a library timestamp for display.
+
+    The timestamps are always stored as "%Y%m%d_%H%M%S", so they are sliced directly
+    rather than parsed with time.strptime.
+
+    Args:
+        timestamp(str): The timestamp stored in the library.
+
+    Returns:
+        (str): The timestamp formatted as "%b %d %Y - %H:%M:%S".
+    """
+    return "{month} {day} {year} - {hour}:{minute}:{second}".format(
+        month=_MONTHS[int(timestamp[4:6])],
+        day=timestamp[6:8],
+        year=timestamp[0:4],
+        hour=timestamp[9:11],
+        minute=timestamp[11:13],
+        second=timestamp[13:15],
+    )
 
 
 def write_json(cpio_filepath, user, time, description, category):
@@ -238,38 +351,38 @@ def paste_nodes():
     if len(dictionary) == 0:
         raise Warning("There are no saved clips for {}".format(category))
 
-    keys = list(dictionary.keys())
-
-    names = []
+    items = list(dictionary.items())
 
-    for key in keys:
-        d = dictionary[key]
-        t = time.strftime(
-            "%b %d %Y - %H:%M:%S", time.strptime(d["time"], "%Y%m%d_%H%M%S")
-        )
-        names.append(" | ".join([d["user"], t, d["description"]]))
+    names = [
+        " | ".join([d["user"], format_time(d["time"]), d["description"]])
+        for _, d in items
+    ]
 
     choices = hou.ui.selectFromList(names)
 
     bounds = pane.visibleBounds()
 
     for c in choices:
-        path = keys[c]
+        path = items[c][0]
 
         # Load items in
-        c1 = parent_node.children()
+        existing_ids = {child.sessionId() for child in parent_node.children()}
         parent_node.loadItemsFromFile(path)
-        c2 = parent_node.children()
 
         # Calculate the new nodes
-        new_children = list(set(c2) - set(c1))
+        new_children = [
+            child
+            for child in parent_node.children()
+            if child.sessionId() not in existing_ids
+        ]
 
         # Calculate offset
         offset = bounds.center() - new_children[0].position()
 
-        # Offset to centre of the pane
-        for n in new_children:
-            n.move(offset)
+        # Offset to centre of the pane, as a single undo step
+        with hou.undos.group("Cross paste offset"):
+            for n in new_children:
+                n.move(offset)
 
         # Log the file we pasted from
         logger.info("Loaded nodes from {}".format(path))
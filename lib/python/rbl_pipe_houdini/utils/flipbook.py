@@ -2,10 +2,12 @@
 
 """Flipbook tools."""
 
-import glob
 import logging
 import os
+import shlex
+import shutil
 import subprocess
+import threading
 import time
 
 import hou
@@ -32,6 +34,7 @@ class Flipbook(object):
         # Setup
         self.filename = "default"
         self.version = 1
+        self._backup_thread = None
 
         # Run the updates
         self.update_viewer()
@@ -50,13 +53,9 @@ class Flipbook(object):
 
     def update_output_path(self):
         """Update the output path."""
-        file_version = "{filename}_v{version:03d}".format(
-            filename=self.filename, version=self.version
-        )
+        file_version = f"{self.filename}_v{self.version:03d}"
         self.output_root = os.path.join(self.hip_path, self.folder, file_version)
-        self.output_path = "{root}/{name}.$F4.jpg".format(
-            root=self.output_root, name=file_version
-        )
+        self.output_path = f"{self.output_root}/{file_version}.$F4.jpg"
 
     def update_flipbook_settings(self):
         """Update the settings."""
@@ -68,8 +67,14 @@ class Flipbook(object):
 
         self.flipbook_settings = flipbook_settings
 
-    def run(self):
-        """Run the flipbook."""
+    def run(self, wait=True):
+        """Run the flipbook.
+
+        Args:
+            wait(:obj:`bool`, optional): Wait for the backup to finish saving before
+                returning. Otherwise wait_for_backup should be called once the
+                backup is needed.
+        """
         # Make sure all settings are latest
         self.update_flipbook_settings()
         self.update_viewport()
@@ -77,17 +82,22 @@ class Flipbook(object):
         # Validate where to save
         self.validation()
 
-        # Saves a backup if enabled
+        # Saves a backup if enabled, this is copied in the background while the
+        # flipbook renders
         self.save_backup()
 
         # Run the flipbook to save out
-        self.viewer.flipbook(self.current_viewport, self.flipbook_settings)
+        try:
+            self.viewer.flipbook(self.current_viewport, self.flipbook_settings)
+        finally:
+            if wait:
+                self.wait_for_backup()
 
         # Opens the flipbook in rv if enabled
         self.launch_rv()
 
         # Prints out the save file
-        logger.info("Saving flipbook to: {path}".format(path=self.output_path))
+        logger.info("Saving flipbook to: %s", self.output_path)
 
     def validation(self):
         """Validate the save location, to make sure we don't overwrite anything.
@@ -100,29 +110,35 @@ class Flipbook(object):
 
         # Check if anything exists ##
 
-        # Check if folder exists
-        if not os.path.exists(self.output_root):
-            os.makedirs(self.output_root)
+        # Finds all files if the folder exists, otherwise create it
+        try:
+            with os.scandir(self.output_root) as entries:
+                files = [
+                    entry.name
+                    for entry in entries
+                    if entry.name.endswith(".jpg")
+                    and not entry.name.startswith(".")
+                    and entry.is_file()
+                ]
+        except FileNotFoundError:
+            os.makedirs(self.output_root, exist_ok=True)
             os.chmod(self.output_root, 0o770)
-        else:
-
-            # Finds all files if they exist
-            files = glob.glob("{dir}/*.jpg".format(dir=self.output_root))
+            files = []
 
-            # Check if any files in the folder
-            if len(files) > 0:
+        # Check if any files in the folder
+        if len(files) > 0:
 
-                # Get the frame numbers, presumes they're written out in file.$F4.jpg
-                # format.
-                try:
-                    frames = [int(x.split(".")[-2]) for x in files]
-                except IndexError:
-                    raise Warning("There are non ripbook files in your folder")
+            # Get the frame numbers, presumes they're written out in file.$F4.jpg
+            # format.
+            try:
+                frames = {int(x.rsplit(".", 2)[-2]) for x in files}
+            except (IndexError, ValueError):
+                raise Warning("There are non ripbook files in your folder")
 
-                # Check if any files match the frame range
-                for f in range(self.frame_range[0], self.frame_range[1]):
-                    if f in frames:
-                        exists = True
+            # Check if any files match the frame range
+            exists = not frames.isdisjoint(
+                range(self.frame_range[0], self.frame_range[1])
+            )
 
         # If the files already exist, checks if you want to overwrite them
         if exists:
@@ -132,9 +148,8 @@ class Flipbook(object):
                 )
             ):
                 hou.ui.displayMessage(
-                    "The latest version is {vers}, please choose a higher one".format(
-                        vers=self.max_version()
-                    )
+                    f"The latest version is {self.max_version()}, please choose a "
+                    "higher one"
                 )
                 raise Warning("This version didn't want to be overwritten")
 
@@ -161,33 +176,70 @@ class Flipbook(object):
         og_file = hou.hipFile.path()
 
         # Define filepath
-        hip_filename = "{root}/hip/{hipname}_{time}.hip".format(
-            root=self.output_root,
-            hipname=hou.text.expandString("$HIPNAME"),
-            time=time.strftime("%Y%m%d%H%M%S"),
-        )
+        hipname = hou.text.expandString("$HIPNAME")
+        timestamp = time.strftime("%Y%m%d%H%M%S")
+        # Keep the source extension so .hipnc and .hiplc backups stay loadable
+        extension = os.path.splitext(og_file)[1]
+        hip_filename = f"{self.output_root}/hip/{hipname}_{timestamp}{extension}"
 
         # Check to see it exists before saving
         if os.path.isfile(hip_filename):
-            if hou.ui.displayConfirmation(
+            if not hou.ui.displayConfirmation(
                 "That hip file already exists, do you want to overwrite it?"
             ):
-                hou.hipFile.save(file_name=hip_filename, save_to_recent_files=False)
+                return hip_filename
 
-        # Return filename to original
-        hou.hipFile.setName(og_file)
+        # The session has no unsaved changes, so copying the hip file on disk gives
+        # the same backup as saving it, and can be done off the main thread
+        self._backup_thread = threading.Thread(
+            target=self._copy_backup,
+            args=(og_file, hip_filename),
+        )
+        self._backup_thread.start()
 
         return hip_filename
 
+    @staticmethod
+    def _copy_backup(source, destination):
+        """Copy the hip file to the backup location.
+
+        Args:
+            source(str): The hip file to back up.
+            destination(str): The filepath to save the backup to.
+        """
+        try:
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            shutil.copyfile(source, destination)
+        except OSError:
+            logger.exception("Failed to save backup to: %s", destination)
+
+    def wait_for_backup(self):
+        """Wait for any backup being saved in the background to finish."""
+        if self._backup_thread is not None:
+            self._backup_thread.join()
+            self._backup_thread = None
+
     def max_version(self):
         """Calculate the current max version based on the folders.
 
         Returns:
             (int): The maximum version.
         """
-        versions = glob.glob("{path}*".format(path=self.output_root.rsplit("_", 1)[0]))
-        versions = [int(x.split("_")[-1][1:]) for x in versions]
-        return max(versions)
+        parent = os.path.dirname(self.output_root)
+        name = os.path.basename(self.output_root).rsplit("_", 1)[0]
+        prefix = f"{name}_v"
+
+        versions = []
+        try:
+            with os.scandir(parent) as entries:
+                for entry in entries:
+                    version = entry.name[len(prefix) :]
+                    if entry.name.startswith(prefix) and version.isdigit():
+                        versions.append(int(version))
+        except FileNotFoundError:
+            pass
+
+        return max(versions, default=0)
 
     def update_from_ui(self, **kwargs):
         """Update the values from the current ui settings.
@@ -221,8 +273,7 @@ class Flipbook(object):
         # Run rv
         config = get_config()
         rv_bin = config.get("flipbook_rv_bin")
-        arg_str = "{} {}".format(rv_bin, path)
-        subprocess.Popen(arg_str, shell=True)
+        subprocess.Popen(shlex.split(rv_bin) + [path])
 
     # Upload the flipbook to shotgun
     def submit(self, comment="Default", path=None):
@@ -262,11 +313,7 @@ class Flipbook(object):
         # Set dispatcher settings
         dispatcher.setParms({"job_name": "`$HIPNAME`_Flipbook"})
 
-        logger.info(
-            "Submitting: {path} Comment: {comment}".format(
-                path=path, comment=comment
-            )
-        )
+        logger.info("Submitting: %s Comment: %s", path, comment)
 
         # Run and destroy ropnet
         dispatcher.parm("submit").pressButton()
@@ -252,12 +252,15 @@ def force_ui_update(parm_paths):
     Clicking on the UI item forces it to refresh.
 
     Args:
-        parm_paths(list): A list of Houdini parameter paths to refresh in the UI.
+        parm_paths(list): A list of Houdini parameter paths (or hou.Parm objects) to
+            refresh in the UI.
     """
     for path in parm_paths:
-        parm = hou.parm(path)
+        # Parms that are already resolved don't need looking up again.
+        parm = path if isinstance(path, hou.Parm) else hou.parm(path)
         if not parm:
             logger.warning("Parameter not found: {path}".format(path=path))
+            continue
 
         # Force the UI to update by clicking the parm.
         parm.pressButton()
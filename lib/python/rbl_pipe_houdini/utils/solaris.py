@@ -2,6 +2,7 @@
 
 """Houdini solaris utility functions."""
 
+import functools
 import logging
 import os
 
@@ -18,28 +19,39 @@ from rbl_pipe_usd.utils import rendersettings
 
 logger = logging.getLogger(__name__)
 
+# How many times to try loading a stage before giving up
+_STAGE_RETRY_ATTEMPTS = 100
 
-def stage_available(node_path):
-    """Check if the USD stage is available for the given node.
+# Directories created by this module during the session
+_created_dirs = set()
+
+# The layer save paths for each (node path, usd path), along with the node cook they
+# were evaluated for
+_layer_paths_cache = {}
+
+
+def _resolve(node_path):
+    """Get the node and its USD stage for the given node path.
 
     Args:
         node_path(str): The Houdini scene path to the node we want to inspect.
 
     Returns:
-        bool: Whether the stage can be loaded
+        (tuple): The node and its USD stage, or (None, None) if the stage can't be
+            loaded.
     """
     node = nodes.node_at_path(node_path)
 
     if not node:
-        return False
+        return None, None
 
-    stage = False
+    stage = None
 
     # There seems to be a bug where the stage isn't instantly availble once a Houdini
     # scene finishes loading. It is normally available after a couple of attempts, so
     # adding this workaround for now.
     count = 0
-    while not stage and count < 100:
+    while not stage and count < _STAGE_RETRY_ATTEMPTS:
         count += 1
         stage = node.stage()
         logger.debug("Attempt {count} to load stage.".format(count=count))
@@ -48,9 +60,21 @@ def stage_available(node_path):
         logger.info("Stage loaded after {count} attempts.".format(count=count))
     else:
         logger.warning("Stage cannot be loaded. Check the Houdini Update Mode")
-        return False
+        return None, None
+
+    return node, stage
 
-    return True
+
+def stage_available(node_path):
+    """Check if the USD stage is available for the given node.
+
+    Args:
+        node_path(str): The Houdini scene path to the node we want to inspect.
+
+    Returns:
+        bool: Whether the stage can be loaded
+    """
+    return _resolve(node_path)[1] is not None
 
 
 def is_implicit_ref(path):
@@ -76,11 +100,10 @@ def get_references(node_path):
         external_references(list): A list of any external references in the USD
         stage.
     """
-    if not stage_available(node_path):
+    _, stage = _resolve(node_path)
+    if stage is None:
         return []
 
-    node = nodes.node_at_path(node_path)
-    stage = node.stage()
     root = stage.GetRootLayer()
 
     external_references = []
@@ -95,36 +118,58 @@ def get_references(node_path):
     return external_references
 
 
-def implicit_references(node_path, external_references=None):
-    """Get any implicit references for the USD stage based on the given node.
+@functools.lru_cache(maxsize=1024)
+def _is_asset_ref(path):
+    """Check if the given path is an asset reference, caching the result.
+
+    Args:
+        path(str): The path we want to check.
+
+    Returns:
+        (bool): Is the path an asset reference.
+    """
+    return ar.is_asset_ref(path)
+
+
+def classify_references(node_path, external_references=None):
+    """Sort the external references for the given node into implicit, turret and file
+    references.
 
     Args:
         node_path(str): The Houdini scene path to the node we want to inspect.
         external_references(list): A list of references to use. Otherwise the
             references will be generated for the given node, before being
-            filtered into implicit references.
+            classified.
 
     Returns:
-        implicit(list): A list of any implicit references in the USD stage.
+        (dict): The "implicit", "turret" and "file" references in the USD stage.
     """
     if external_references is None:
         external_references = get_references(node_path)
 
+    classified = {"implicit": [], "turret": [], "file": []}
+
     if not external_references:
         logger.info(
             "No external references found for {node_path}".format(
                 node_path=node_path,
             )
         )
-        return []
+        return classified
 
-    implicit = [ref for ref in external_references if is_implicit_ref(ref)]
+    for ref in external_references:
+        if is_implicit_ref(ref):
+            classified["implicit"].append(ref)
+        elif _is_asset_ref(ref):
+            classified["turret"].append(ref)
+        else:
+            classified["file"].append(ref)
 
-    return implicit
+    return classified
 
 
-def file_references(node_path, external_references=None):
-    """Get any file references for the USD stage based on the given node.
+def implicit_references(node_path, external_references=None):
+    """Get any implicit references for the USD stage based on the given node.
 
     Args:
         node_path(str): The Houdini scene path to the node we want to inspect.
@@ -133,26 +178,24 @@ def file_references(node_path, external_references=None):
             filtered into implicit references.
 
     Returns:
-        file_refs(list): A list of any file references in the USD stage.
+        implicit(list): A list of any implicit references in the USD stage.
     """
-    if external_references is None:
-        external_references = get_references(node_path)
+    return classify_references(node_path, external_references)["implicit"]
 
-    if not external_references:
-        logger.info(
-            "No external references found for {node_path}".format(
-                node_path=node_path,
-            )
-        )
-        return []
 
-    file_refs = [
-        ref
-        for ref in external_references
-        if not ar.is_asset_ref(ref) and not is_implicit_ref(ref)
-    ]
+def file_references(node_path, external_references=None):
+    """Get any file references for the USD stage based on the given node.
+
+    Args:
+        node_path(str): The Houdini scene path to the node we want to inspect.
+        external_references(list): A list of references to use. Otherwise the
+            references will be generated for the given node, before being
+            filtered into implicit references.
 
-    return file_refs
+    Returns:
+        file_refs(list): A list of any file references in the USD stage.
+    """
+    return classify_references(node_path, external_references)["file"]
 
 
 def turret_references(node_path, external_references=None):
@@ -167,20 +210,7 @@ def turret_references(node_path, external_references=None):
     Returns:
         turret_refs(list): A list of any Turret references in the USD stage.
     """
-    if external_references is None:
-        external_references = get_references(node_path)
-
-    if not external_references:
-        logger.info(
-            "No external references found for {node_path}".format(
-                node_path=node_path,
-            )
-        )
-        return []
-
-    turret_refs = [ref for ref in external_references if ar.is_asset_ref(ref)]
-
-    return turret_refs
+    return classify_references(node_path, external_references)["turret"]
 
 
 def display_usd_filepaths(node_path, prim_path):
@@ -195,7 +225,8 @@ def display_usd_filepaths(node_path, prim_path):
         None
     """
     # Check we can actually access the stage
-    if not stage_available(node_path):
+    _, stage = _resolve(node_path)
+    if stage is None:
         dialog.display_message(
             "Stage is not available.",
             title="USD Path Inspector",
@@ -203,81 +234,57 @@ def display_usd_filepaths(node_path, prim_path):
         )
         return
 
-    # Access the usd stage and get the prim stack
-    node = nodes.node_at_path(node_path)
-    stage = node.stage()
+    # Get the prim stack
     prim = stage.GetPrimAtPath(prim_path)
     prim_stack = prim.GetPrimStack()
 
+    # Collect the unique layer paths, keeping the prim stack order
+    seen = set()
     msg = []
     for ps in prim_stack:
-        if ps.layer.realPath:
-            msg.append(
-                "File Path: {path}".format(
-                    path=ps.layer.realPath,
-                )
-            )
-
-    # Remove any duplicates
-    msg = list(set(msg))
+        path = ps.layer.realPath
+        if path and path not in seen:
+            seen.add(path)
+            msg.append("File Path: {path}".format(path=path))
 
     if msg:
-        msg.insert(
-            0,
-            "The following USD file information was found from the selected \
-                prim path {path}:\n".format(
-                path=prim_path
-            ),
+        full_msg = (
+            "The following USD file information was found from the selected "
+            "prim path {path}:\n\n{files}".format(path=prim_path, files="\n".join(msg))
         )
     else:
-        msg.insert(
-            0,
-            "No USD file information could be found for the selected \
-                path ({path})".format(
-                path=prim_path
-            ),
+        full_msg = (
+            "No USD file information could be found for the selected "
+            "path ({path})".format(path=prim_path)
         )
 
-    full_msg = "\n".join(msg)
     dialog.display_message(
         full_msg,
         title="USD Path Inspector",
     )
 
 
-def __get_layer_paths(node_path, usd_path):
-    """Evaluate the USD stage at the given node path for any layer save paths.
+def _iter_layer_paths(stage, usd_path):
+    """Iterate over the layer save paths for the given USD stage.
 
     Houdini writes metadata about the save paths for layers under
-    /HoudiniLayerInfo, so we can read this and assemble a list of paths that
-    will be written to by the stage.
+    /HoudiniLayerInfo, so we can read this and yield each unique path that will be
+    written to by the stage.
 
     Args:
-        node_path(str): The Houdini scene path to the LOP node we want to
-            inspect.
+        stage(pxr.Usd.Stage): The USD stage to inspect.
         usd_path(str): The file path to the USD file that is being written.
 
-    Returns:
-        unique_save_paths(list): A list of any file paths that will be written
+    Yields:
+        (dict): The "path" and "type" of each unique file path that will be written
             to for the given stage.
 
     Raises:
         RuntimeError: Unexpected character found in node name.
     """
-    # Check we can actually access the stage
-    if not stage_available(node_path):
-        dialog.display_message(
-            "Stage is not available.",
-            severity=hou.severityType.Error,
-        )
-        return
-
-    # Access the usd stage and get the layer stack
-    node = nodes.node_at_path(node_path)
-    stage = node.stage()
     session_layer = stage.GetSessionLayer()
 
-    save_paths = []
+    seen = set()
 
     for layer in session_layer.GetLoadedLayers():
         # We ae only interested in layers that have the /HoudiniLayerInfo prim
@@ -316,15 +323,47 @@ def __get_layer_paths(node_path, usd_path):
                     )
                     path_record["type"] = "implicit"
 
-                save_paths.append(path_record)
+                # Make sure all paths are unique
+                if path_record["path"] not in seen:
+                    seen.add(path_record["path"])
+                    yield path_record
+
+
+def __get_layer_paths(node_path, usd_path, lazy=False):
+    """Evaluate the USD stage at the given node path for any layer save paths.
+
+    Args:
+        node_path(str): The Houdini scene path to the LOP node we want to
+            inspect.
+        usd_path(str): The file path to the USD file that is being written.
+        lazy(:obj:`bool`, optional): Return an iterator over the paths when they
+            aren't already cached, rather than evaluating and caching them all.
+
+    Returns:
+        unique_save_paths(list): A list of any file paths that will be written
+            to for the given stage.
+    """
+    # Check we can actually access the stage
+    node, stage = _resolve(node_path)
+    if stage is None:
+        dialog.display_message(
+            "Stage is not available.",
+            severity=hou.severityType.Error,
+        )
+        return
+
+    # The layer info only changes when the node cooks again
+    cook_key = (node.sessionId(), node.cookCount())
+    cached = _layer_paths_cache.get((node_path, usd_path))
+    if cached and cached[0] == cook_key:
+        return cached[1]
 
-    # Make sure all paths are unique
-    unique_save_paths = []
-    for path in save_paths:
-        all_paths = [unique_path.get("path") for unique_path in unique_save_paths]
-        if path.get("path") not in all_paths:
-            unique_save_paths.append(path)
+    if lazy:
+        return _iter_layer_paths(stage, usd_path)
 
+    unique_save_paths = list(_iter_layer_paths(stage, usd_path))
+
+    _layer_paths_cache[(node_path, usd_path)] = (cook_key, unique_save_paths)
     return unique_save_paths
 
 
@@ -340,10 +379,12 @@ def includes_implicit_layer_paths(node_path, usd_path):
     Returns:
             bool: Are there any implicit layers.
     """
-    if get_implicit_layer_paths(node_path, usd_path):
-        return True
+    # Stop at the first implicit layer found
+    layer_paths = __get_layer_paths(node_path, usd_path, lazy=True)
+    if layer_paths is None:
+        return False
 
-    return False
+    return any(path.get("type") == "implicit" for path in layer_paths)
 
 
 def get_explicit_layer_paths(node_path, usd_path):
@@ -386,6 +427,25 @@ def get_implicit_layer_paths(node_path, usd_path):
     ]
 
 
+def _create_directories(directories):
+    """Create the given directories, skipping any created earlier in the session.
+
+    Every requested directory is passed to `filesystem.create_directory`, so each
+    one gets its permissions applied even when it is the parent of another.
+
+    Args:
+        directories(set): The directories to create.
+    """
+    # Create the parents first, so they aren't created as a side effect of creating
+    # a directory beneath them
+    for directory in sorted(directories, key=len):
+        if directory in _created_dirs and os.path.isdir(directory):
+            continue
+
+        filesystem.create_directory(directory)
+        _created_dirs.add(directory)
+
+
 def create_usd_directories(node_path, usd_path):
     """
     Create all directories required for a usd write.
@@ -395,39 +455,29 @@ def create_usd_directories(node_path, usd_path):
             create directories based upon.
         usd_path(str): The filepath to the main USD file being written.
     """
-    # Check we can actually access the stage
-    if not stage_available(node_path):
-        dialog.display_message(
-            "Stage is not available.",
-            severity=hou.severityType.Error,
-        )
+    # Evaluate the layer paths, this also checks we can actually access the stage
+    layer_paths = __get_layer_paths(node_path, usd_path)
+    if layer_paths is None:
         return
 
-    usd_dirs = []
-
     # Always include the master usd itself
-    usd_dir = os.path.dirname(usd_path)
-    usd_dirs.append(usd_dir)
+    usd_dirs = {os.path.dirname(usd_path)}
 
     # Add any explicit render USDs
-    layer_paths = __get_layer_paths(node_path, usd_path)
-
-    usd_dirs.extend(
-        [os.path.dirname(layer_path.get("path")) for layer_path in layer_paths]
+    usd_dirs.update(
+        os.path.dirname(layer_path.get("path")) for layer_path in layer_paths
     )
-
-    # Remove any duplicates
-    usd_dirs = list(set(usd_dirs))
+    usd_dirs.discard("")
 
     # Make sure all directories are created with the correct permissions
-    for dir in usd_dirs:
-        filesystem.create_directory(dir)
+    _create_directories(usd_dirs)
 
 
 def get_render_output_paths(
     node_path,
     render_settings_path,
     override_image_path=None,
+    frame=None,
 ):
     """
     Get the output paths for a given usd render.
@@ -439,6 +489,8 @@ def get_render_output_paths(
             render we want to get output paths for.
         override_image_path(str): The image path if overriden directly outside
             the render settings (ie. through husk).
+        frame(float): The frame to evaluate the paths at. Defaults to the current
+            frame.
 
     Returns:
         list: A list of render image paths.
@@ -447,21 +499,18 @@ def get_render_output_paths(
         return [override_image_path]
 
     # Check we can actually access the stage
-    if not stage_available(node_path):
+    _, stage = _resolve(node_path)
+    if stage is None:
         dialog.display_message(
             "Stage is not available.",
             severity=hou.severityType.Error,
         )
         return []
 
-    # Access the usd stage
-    node = nodes.node_at_path(node_path)
-    stage = node.stage()
-
     return rendersettings.get_output_paths(
         stage,
         render_settings_path,
-        frame=hou.frame(),
+        frame=hou.frame() if frame is None else frame,
     )
 
 
@@ -469,6 +518,7 @@ def create_render_directories(
     node_path,
     render_settings_path,
     override_image_path=None,
+    frame=None,
 ):
     """
     Create all directories required for a usd render.
@@ -480,20 +530,26 @@ def create_render_directories(
             render we want to create output paths for.
         override_image_path(str): The image path if overriden directly outside
             the render settings (ie. through husk).
+        frame(float): The frame to evaluate the paths at. Defaults to the current
+            frame.
     """
     render_paths = get_render_output_paths(
         node_path,
         render_settings_path,
         override_image_path=override_image_path,
+        frame=frame,
     )
 
+    render_dirs = set()
     for path in render_paths:
         dir_name = os.path.dirname(path)
         if dir_name:
-            filesystem.create_directory(dir_name)
+            render_dirs.add(dir_name)
         else:
             logger.warning(
                 "Skipping invalid directory: {dirname}".format(
                     dirname=dir_name,
                 )
             )
+
+    _create_directories(render_dirs)
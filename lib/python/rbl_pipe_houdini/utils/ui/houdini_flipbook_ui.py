@@ -5,6 +5,7 @@
 import logging
 
 from PySide2 import QtCore
+from PySide2.QtGui import QIntValidator
 from PySide2.QtWidgets import (
     QApplication,
     QCheckBox,
@@ -24,6 +25,43 @@ from rbl_pipe_houdini.utils import flipbook
 
 logger = logging.getLogger(__name__)
 
+# The style for the option checkboxes, applied once to the whole dialog
+_CHECKBOX_QSS = (
+    "QCheckBox#flipbookCbox"
+    "{"
+    "border : 0px solid black;"
+    "margin-left:5px;"
+    "margin-right:0px;"
+    "}"
+)
+
+
+class _JobSignals(QtCore.QObject):
+    """Signals emitted by a background job."""
+
+    finished = QtCore.Signal()
+
+
+class _Job(QtCore.QRunnable):
+    """Run a function on the Qt thread pool."""
+
+    def __init__(self, func):
+        """Initialise the job.
+
+        Args:
+            func(callable): The function to run, this must not touch hou or Qt.
+        """
+        super(_Job, self).__init__()
+        self.func = func
+        self.signals = _JobSignals()
+
+    def run(self):
+        """Run the function, emitting finished once it is done."""
+        try:
+            self.func()
+        finally:
+            self.signals.finished.emit()
+
 
 class FlipbookUI(QWidget):
     """Create's the UI for flipbooks."""
@@ -36,17 +74,45 @@ class FlipbookUI(QWidget):
         """
         QWidget.__init__(self, parent, QtCore.Qt.WindowStaysOnTopHint)
 
+        # Try to keep it on top
+        self.setWindowFlags(QtCore.Qt.WindowStaysOnTopHint)
+
+        # The widgets and flipbook are created when the UI is first shown
+        self.flipbook = None
+        self._initialized = False
+
+        # The ui values last passed to the flipbook, and the hip file they were for
+        self._ui_state = None
+        self._last_hip_path = None
+
+        # The output path in the form copied to the clipboard
+        self._clipboard = QApplication.clipboard()
+        self._clipboard_path = None
+
+        # The job waiting for the flipbook backup to be saved
+        self._backup_job = None
+
+    def initialize(self):
+        """Build the UI, if this hasn't already been done.
+
+        The flipbook itself is created once the window has been drawn.
+        """
+        if self._initialized:
+            return
+
         # Sets up the UI
         self.setup_ui()
+        self.path.setText("(computing...)")
 
-        # Try to keep it on top
-        self.setWindowFlags(QtCore.Qt.WindowStaysOnTopHint)
+        QtCore.QTimer.singleShot(0, self._late_init)
 
-        # Setups up the flipbook class
-        self.flipbook = flipbook.Flipbook()
+        self._initialized = True
 
-        # Updates the output path
-        self.update_path()
+    def _late_init(self):
+        """Set up the flipbook class and update the output path."""
+        self.flipbook = flipbook.Flipbook()
+        self._last_hip_path = hou.hipFile.path()
+        self.update_ui()
 
     def setup_ui(self):
         """Set up the ui."""
@@ -64,7 +130,9 @@ class FlipbookUI(QWidget):
         # Description label
         self.label = QLabel("Use this to run and submit a Flipbook", self)
         self.label.setAlignment(QtCore.Qt.AlignCenter)
-        self.description_separator = self.create_hseparator()
+        self.description_separator = QFrame()
+        self.description_separator.setFrameShape(QFrame.HLine)
+        self.description_separator.setFrameShadow(QFrame.Raised)
 
         self.description_lay.addWidget(self.label)
 
@@ -72,15 +140,21 @@ class FlipbookUI(QWidget):
 
         self.frame_range_row = QHBoxLayout()
 
+        # Shared by the four digit frame and resolution fields
+        four_digit_validator = QIntValidator(0, 9999, self)
+
+        # The global frame range ($FSTART, $FEND)
+        fstart, fend = hou.playbar.frameRange()
+
         # Start Frame
         self.start_lbl = QLabel("Frame Range:")
-        self.start_frame = QLineEdit(hou.text.expandString("$FSTART"))
-        self.start_frame.setInputMask("####")
+        self.start_frame = QLineEdit(str(int(fstart)))
+        self.start_frame.setValidator(four_digit_validator)
         self.start_frame.setFixedWidth(40)
 
         # Start Frame
-        self.end_frame = QLineEdit(hou.text.expandString("$FEND"))
-        self.end_frame.setInputMask("####")
+        self.end_frame = QLineEdit(str(int(fend)))
+        self.end_frame.setValidator(four_digit_validator)
         self.end_frame.setFixedWidth(40)
 
         # Add to layout
@@ -93,12 +167,12 @@ class FlipbookUI(QWidget):
         # Resolution X
         self.resx_lbl = QLabel("  Resolution:")
         self.resx = QLineEdit("1920")
-        self.resx.setInputMask("####")
+        self.resx.setValidator(four_digit_validator)
         self.resx.setFixedWidth(40)
 
         # Resolution Y
         self.resy = QLineEdit("1080")
-        self.resy.setInputMask("####")
+        self.resy.setValidator(four_digit_validator)
         self.resy.setFixedWidth(40)
 
         # Add to layout
@@ -115,7 +189,7 @@ class FlipbookUI(QWidget):
 
         self.version_lbl = QLabel("  Version:")
         self.version = QLineEdit("1")
-        self.version.setInputMask("##")
+        self.version.setValidator(QIntValidator(1, 99, self))
         self.version.setFixedWidth(60)
         self.version.editingFinished.connect(self.update_ui)
 
@@ -128,14 +202,18 @@ class FlipbookUI(QWidget):
 
         self.path_lay = QHBoxLayout()
 
-        self.button_separator = self.create_hseparator()
+        self.button_separator = QFrame()
+        self.button_separator.setFrameShape(QFrame.HLine)
+        self.button_separator.setFrameShadow(QFrame.Raised)
 
         self.path = QLabel("path")
         self.path.setAlignment(QtCore.Qt.AlignCenter)
 
         self.path_lay.addWidget(self.path)
 
-        self.path_bottom_separator = self.create_hseparator()
+        self.path_bottom_separator = QFrame()
+        self.path_bottom_separator.setFrameShape(QFrame.HLine)
+        self.path_bottom_separator.setFrameShadow(QFrame.Raised)
 
         # ---------- Flipbook Functions ----------
 
@@ -147,25 +225,11 @@ class FlipbookUI(QWidget):
 
         self.cbox_hip_save = QCheckBox("Backup")
         self.cbox_hip_save.setChecked(True)
-        self.cbox_hip_save.setStyleSheet(
-            "QCheckBox"
-            "{"
-            "border : 0px solid black;"
-            "margin-left:5px;"
-            "margin-right:0px;"
-            "}"
-        )
+        self.cbox_hip_save.setObjectName("flipbookCbox")
 
         self.cbox_rv = QCheckBox("RV")
         self.cbox_rv.setChecked(True)
-        self.cbox_rv.setStyleSheet(
-            "QCheckBox"
-            "{"
-            "border : 0px solid black;"
-            "margin-left:5px;"
-            "margin-right:0px;"
-            "}"
-        )
+        self.cbox_rv.setObjectName("flipbookCbox")
 
         self.btn_copy = QPushButton("Copy Path", self)
         self.btn_copy.clicked.connect(self.copy_path)
@@ -177,7 +241,9 @@ class FlipbookUI(QWidget):
         self.btn_rv = QPushButton("RV", self)
         self.btn_rv.clicked.connect(self.rv)
 
-        self.vert_separator = self.create_vseparator()
+        self.vert_separator = QFrame()
+        self.vert_separator.setFrameShape(QFrame.VLine)
+        self.vert_separator.setFrameShadow(QFrame.Raised)
 
         self.upload_label = QLabel("Comment:")
         self.upload_comment = QLineEdit("My cool flipbook")
@@ -202,76 +268,100 @@ class FlipbookUI(QWidget):
         outer_lyt.addWidget(self.path_bottom_separator)
         outer_lyt.addLayout(self.functions_lay)
 
+        self.setStyleSheet(_CHECKBOX_QSS)
         self.setLayout(outer_lyt)
 
-    def create_hseparator(self):
-        """Create a horizontal separator.
-
-        Returns:
-            (QFrame): A horizontal separator.
-        """
-        separator = QFrame()
-        separator.setFrameShape(QFrame.HLine)
-        separator.setFrameShadow(QFrame.Raised)
-        return separator
-
-    def create_vseparator(self):
-        """Create a vertical separator.
-
-        Returns:
-            (QFrame): A vertical separator.
-        """
-        separator = QFrame()
-        separator.setFrameShape(QFrame.VLine)
-        separator.setFrameShadow(QFrame.Raised)
-        return separator
-
     def run_flipbook(self):
         """Run the flipbook."""
+        # The flipbook is still being set up
+        if self.flipbook is None:
+            return
+
         # Updates from the UI
         self.update_ui()
 
-        # Run the flipbook
-        self.flipbook.run()
+        # Run the flipbook, this has to happen on the main thread. Any backup is
+        # left saving in the background, with the button disabled until it is done.
+        self.btn_run.setEnabled(False)
+        try:
+            self.flipbook.run(wait=False)
+        finally:
+            self._backup_job = _Job(self.flipbook.wait_for_backup)
+            self._backup_job.signals.finished.connect(self.flipbook_finished)
+            QtCore.QThreadPool.globalInstance().start(self._backup_job)
+
+    def flipbook_finished(self):
+        """Handle the flipbook and its backup having finished."""
+        self._backup_job = None
+        self.btn_run.setEnabled(True)
 
         # Raise the window to the top again
         self.raise_()
 
     def copy_path(self):
         """Copy the image path to the clipboard."""
+        # The flipbook is still being set up
+        if self.flipbook is None:
+            return
+
         # Assigns text to clipboard
-        path = self.path.text().replace("$F4", "####")
-        QApplication.clipboard().setText(path)
-        logger.info("Setting the clipboard to: {path}".format(path=path))
+        path = self._clipboard_path
+        self._clipboard.setText(path)
+        logger.info("Setting the clipboard to: %s", path)
 
     def update_path(self):
         """Update the path."""
-        self.path.setText(self.flipbook.get_path())
+        path = self.flipbook.get_path()
+        self._clipboard_path = path.replace("$F4", "####")
+        self.path.setText(path)
 
     def update_ui(self):
         """Update the flipbook module with the data from the ui."""
+        # The flipbook is still being set up
+        if self.flipbook is None:
+            return
+
         # Grab frame range
         frame_range = [int(self.start_frame.text()), int(self.end_frame.text())]
+        version = int(self.version.text())
+        filename = self.filename.text()
+        save = self.cbox_hip_save.isChecked()
+        openrv = self.cbox_rv.isChecked()
+        resolution = (int(self.resx.text()), int(self.resy.text()))
+
+        # Nothing to do if the ui hasn't changed since the last update
+        ui_state = (tuple(frame_range), version, filename, save, openrv, resolution)
+        if ui_state == self._ui_state:
+            return
 
         # Update the values from UI
         self.flipbook.update_from_ui(
             frame_range=frame_range,
-            version=int(self.version.text()),
-            filename=self.filename.text(),
-            save=self.cbox_hip_save.isChecked(),
-            openrv=self.cbox_rv.isChecked(),
-            resolution=((int(self.resx.text()), int(self.resy.text()))),
+            version=version,
+            filename=filename,
+            save=save,
+            openrv=openrv,
+            resolution=resolution,
         )
 
         self.update_path()
+        self._ui_state = ui_state
 
     def rv(self):
         """Run rv on the output sequence."""
+        # The flipbook is still being set up
+        if self.flipbook is None:
+            return
+
         self.update_ui()
         self.flipbook.launch_rv(force=True)
 
     def upload_flipbook(self):
         """Upload the flipbook to shotgun."""
+        # The flipbook is still being set up
+        if self.flipbook is None:
+            return
+
         self.flipbook.submit(comment=self.upload_comment.text())
         self.close_event()
 
@@ -296,7 +386,23 @@ class FlipbookUI(QWidget):
 
     def open_event(self):
         """Handle the open event."""
+        # The flipbook is still being set up
+        if self.flipbook is None:
+            return
+
         self.flipbook.update()
+        self._last_hip_path = hou.hipFile.path()
+
+        # The hip path may have changed, so the path needs rebuilding
+        self._ui_state = None
+
+    def hip_changed(self):
+        """Check if the hip file has changed since the flipbook was last updated.
+
+        Returns:
+            (bool): Has the hip file changed.
+        """
+        return hou.hipFile.path() != self._last_hip_path
 
 
 def run():
@@ -305,7 +411,12 @@ def run():
     if not hasattr(hou.session, "dialog"):
         hou.session.dialog = FlipbookUI()
         hou.session.dialog.setParent(hou.qt.mainWindow(), QtCore.Qt.Window)
+    hou.session.dialog.initialize()
     hou.session.dialog.show()
-    hou.session.dialog.update_ui()
-    hou.session.dialog.open_event()
+
+    # Only refresh the flipbook if the scene has changed since it was last shown
+    if hou.session.dialog.hip_changed():
+        hou.session.dialog.open_event()
+        hou.session.dialog.update_ui()
+
     hou.session.dialog.raise_()
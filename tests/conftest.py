@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+
+"""Shared pytest setup for the pure Python tests.
+
+Houdini and the other rez packages are only available inside a pipeline session, so
+a placeholder module is registered for any of them that can't be imported.
+"""
+
+import importlib
+import os
+import sys
+from unittest import mock
+
+_LIB_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "lib",
+    "python",
+)
+sys.path.insert(0, _LIB_PATH)
+
+_EXTERNAL_MODULES = (
+    "hou",
+    "rbl_pipe_core",
+    "rbl_pipe_core.util",
+    "rbl_pipe_core.util.config",
+    "rbl_pipe_core.util.filesystem",
+    "rbl_pipe_sg",
+    "rbl_pipe_sg.load",
+    "rbl_pipe_sg.template",
+)
+
+for module_name in _EXTERNAL_MODULES:
+    try:
+        importlib.import_module(module_name)
+    except ImportError:
+        sys.modules[module_name] = mock.MagicMock(name=module_name)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+
+"""Tests for rbl_pipe_houdini.utils.crosscopy."""
+
+import json
+import os
+import time
+
+import pytest
+
+from rbl_pipe_houdini.utils import crosscopy
+
+
+@pytest.fixture(autouse=True)
+def clear_json_caches():
+    """Clear the library json caches around each test."""
+    crosscopy._JSON_CACHE.clear()
+    crosscopy._JSON_DIGESTS.clear()
+    yield
+    crosscopy._JSON_CACHE.clear()
+    crosscopy._JSON_DIGESTS.clear()
+
+
+@pytest.fixture
+def json_path(tmp_path):
+    """Get a library json path in a temporary directory.
+
+    Args:
+        tmp_path(pathlib.Path): The pytest temporary directory fixture.
+
+    Returns:
+        (str): The path to the library json.
+    """
+    return str(tmp_path / "Sop.json")
+
+
+@pytest.fixture
+def replace_calls(monkeypatch):
+    """Record the files moved into place by os.replace.
+
+    Args:
+        monkeypatch(pytest.MonkeyPatch): The pytest monkeypatch fixture.
+
+    Returns:
+        (list): The destination of each os.replace call.
+    """
+    calls = []
+    replace = os.replace
+
+    def recording_replace(src, dst):
+        calls.append(dst)
+        replace(src, dst)
+
+    monkeypatch.setattr(crosscopy.os, "replace", recording_replace)
+    return calls
+
+
+def _library_entry(description):
+    """Build a library entry like the ones written by crosscopy.write_json.
+
+    Args:
+        description(str): The description of the copied nodes.
+
+    Returns:
+        (dict): The library entry.
+    """
+    return {
+        "user": "artist",
+        "time": "20240131_235958",
+        "description": description,
+        "show": "test",
+    }
+
+
+@pytest.mark.parametrize(
+    "timestamp",
+    ["20240131_235958", "19991201_000000", "20230704_120530"],
+)
+def test_format_time_matches_strptime(timestamp):
+    expected = time.strftime(
+        "%b %d %Y - %H:%M:%S",
+        time.strptime(timestamp, "%Y%m%d_%H%M%S"),
+    )
+
+    assert crosscopy.format_time(timestamp) == expected
+
+
+def test_format_time():
+    assert crosscopy.format_time("20240131_235958") == "Jan 31 2024 - 23:59:58"
+
+
+def test_write_then_read(json_path):
+    dictionary = {"/a.cpio": _library_entry("first")}
+
+    crosscopy.write_json_dictionary(dictionary, json_path)
+
+    with open(json_path) as fh:
+        assert json.load(fh) == dictionary
+    assert crosscopy.read_json_dictionary(json_path) == dictionary
+
+
+def test_read_uses_cache_while_unchanged(json_path, monkeypatch):
+    dictionary = {"/a.cpio": _library_entry("first")}
+    crosscopy.write_json_dictionary(dictionary, json_path)
+
+    def fail_load(fh):
+        raise AssertionError("The unchanged library shouldn't be re-read.")
+
+    monkeypatch.setattr(crosscopy.json, "load", fail_load)
+
+    assert crosscopy.read_json_dictionary(json_path) == dictionary
+
+
+def test_read_picks_up_external_changes(json_path):
+    crosscopy.write_json_dictionary({"/a.cpio": _library_entry("first")}, json_path)
+    assert "/a.cpio" in crosscopy.read_json_dictionary(json_path)
+
+    changed = {"/b.cpio": _library_entry("written by someone else")}
+    with open(json_path, "w") as fh:
+        json.dump(changed, fh)
+
+    assert crosscopy.read_json_dictionary(json_path) == changed
+
+
+def test_read_returns_independent_copies(json_path):
+    crosscopy.write_json_dictionary({"/a.cpio": _library_entry("first")}, json_path)
+
+    first = crosscopy.read_json_dictionary(json_path)
+    first["/a.cpio"]["description"] = "changed"
+    first["/b.cpio"] = _library_entry("added")
+
+    second = crosscopy.read_json_dictionary(json_path)
+    assert second == {"/a.cpio": _library_entry("first")}
+
+
+def test_write_doesnt_share_the_callers_dictionary(json_path):
+    dictionary = {"/a.cpio": _library_entry("first")}
+    crosscopy.write_json_dictionary(dictionary, json_path)
+
+    dictionary["/a.cpio"]["description"] = "changed"
+
+    assert crosscopy.read_json_dictionary(json_path) == {
+        "/a.cpio": _library_entry("first")
+    }
+
+
+def test_write_skips_unchanged_contents(json_path, replace_calls):
+    dictionary = {"/a.cpio": _library_entry("first")}
+
+    crosscopy.write_json_dictionary(dictionary, json_path)
+    crosscopy.write_json_dictionary(dict(dictionary), json_path)
+
+    assert replace_calls == [json_path]
+
+
+def test_write_changed_contents(json_path, replace_calls):
+    crosscopy.write_json_dictionary({"/a.cpio": _library_entry("first")}, json_path)
+    crosscopy.write_json_dictionary({"/b.cpio": _library_entry("second")}, json_path)
+
+    assert replace_calls == [json_path, json_path]
+    assert list(crosscopy.read_json_dictionary(json_path)) == ["/b.cpio"]
+
+
+def test_write_after_external_change(json_path, replace_calls):
+    dictionary = {"/a.cpio": _library_entry("first")}
+    crosscopy.write_json_dictionary(dictionary, json_path)
+
+    with open(json_path, "w") as fh:
+        json.dump({}, fh)
+
+    crosscopy.write_json_dictionary(dictionary, json_path)
+
+    assert replace_calls == [json_path, json_path]
+    with open(json_path) as fh:
+        assert json.load(fh) == dictionary
+
+
+def test_write_after_file_removed(json_path, replace_calls):
+    dictionary = {"/a.cpio": _library_entry("first")}
+    crosscopy.write_json_dictionary(dictionary, json_path)
+
+    os.remove(json_path)
+    crosscopy.write_json_dictionary(dictionary, json_path)
+
+    assert replace_calls == [json_path, json_path]
+    assert os.path.isfile(json_path)
+
+
+def test_failed_write_removes_temporary_file(json_path, tmp_path, monkeypatch):
+    crosscopy.write_json_dictionary({"/a.cpio": _library_entry("first")}, json_path)
+
+    def failing_replace(src, dst):
+        raise OSError("Disk full")
+
+    monkeypatch.setattr(crosscopy.os, "replace", failing_replace)
+
+    with pytest.raises(RuntimeError):
+        crosscopy.write_json_dictionary(
+            {"/b.cpio": _library_entry("second")},
+            json_path,
+        )
+
+    assert sorted(os.listdir(str(tmp_path))) == ["Sop.json"]
+    assert list(crosscopy.read_json_dictionary(json_path)) == ["/a.cpio"]
@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+
+"""Tests for rbl_pipe_houdini.shotgun.sgcache."""
+
+import pytest
+
+from rbl_pipe_houdini.shotgun import sgcache
+
+
+class FakeClock(object):
+    """A monotonic clock that only moves when told to."""
+
+    def __init__(self):
+        """Start the clock at zero."""
+        self.now = 0.0
+
+    def __call__(self):
+        """Get the current time.
+
+        Returns:
+            (float): The current time in seconds.
+        """
+        return self.now
+
+
+class FakeLoad(object):
+    """A ShotgunLoad stand in that counts its queries."""
+
+    def __init__(self):
+        """Start with no queries made."""
+        self.calls = 0
+
+    def get_tasks(self, entity_id, step=None):
+        """Return a new result for each query.
+
+        Args:
+            entity_id(int): The entity to query.
+            step(:obj:`str`, optional): The step to filter by.
+
+        Returns:
+            (tuple): The query arguments and the query count.
+        """
+        self.calls += 1
+        return (entity_id, step, self.calls)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the monotonic clock used by the cache.
+
+    Args:
+        monkeypatch(pytest.MonkeyPatch): The pytest monkeypatch fixture.
+
+    Returns:
+        (FakeClock): The clock used by the cache.
+    """
+    fake_clock = FakeClock()
+    monkeypatch.setattr(sgcache.time, "monotonic", fake_clock)
+    return fake_clock
+
+
+@pytest.fixture(autouse=True)
+def clear_shared_cache():
+    """Clear the process wide cache around each test."""
+    sgcache.sg_cache.clear()
+    yield
+    sgcache.sg_cache.clear()
+
+
+def test_get_missing_returns_default(clock):
+    cache = sgcache.TTLCache(ttl=10)
+
+    assert cache.get("missing") is None
+    assert cache.get("missing", "default") == "default"
+
+
+def test_get_returns_value_until_expired(clock):
+    cache = sgcache.TTLCache(ttl=10)
+    cache.set("key", "value")
+
+    clock.now = 10
+    assert cache.get("key") == "value"
+
+    clock.now = 10.5
+    assert cache.get("key", "expired") == "expired"
+
+    # The expired entry is removed rather than just hidden.
+    clock.now = 0
+    assert cache.get("key") is None
+
+
+def test_set_refreshes_expiry(clock):
+    cache = sgcache.TTLCache(ttl=10)
+    cache.set("key", "old")
+
+    clock.now = 8
+    cache.set("key", "new")
+
+    clock.now = 15
+    assert cache.get("key") == "new"
+
+
+def test_get_or_set_only_calls_factory_on_miss(clock):
+    cache = sgcache.TTLCache(ttl=10)
+    calls = []
+
+    def factory():
+        calls.append(None)
+        return len(calls)
+
+    assert cache.get_or_set("key", factory) == 1
+    assert cache.get_or_set("key", factory) == 1
+    assert len(calls) == 1
+
+    clock.now = 11
+    assert cache.get_or_set("key", factory) == 2
+    assert len(calls) == 2
+
+
+def test_get_or_set_caches_falsy_values(clock):
+    cache = sgcache.TTLCache(ttl=10)
+    calls = []
+
+    def factory():
+        calls.append(None)
+        return None
+
+    assert cache.get_or_set("key", factory) is None
+    assert cache.get_or_set("key", factory) is None
+    assert len(calls) == 1
+
+
+def test_pop(clock):
+    cache = sgcache.TTLCache(ttl=10)
+    cache.set("key", "value")
+
+    assert cache.pop("key") == "value"
+    assert cache.pop("key", "default") == "default"
+    assert cache.get("key") is None
+
+
+def test_clear(clock):
+    cache = sgcache.TTLCache(ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    cache.clear()
+
+    assert cache.get("a") is None
+    assert cache.get("b") is None
+
+
+def test_cached_call_reuses_result(clock):
+    sg_load = FakeLoad()
+
+    first = sgcache.cached_call(sg_load, "get_tasks", 1, step="fx")
+    second = sgcache.cached_call(sg_load, "get_tasks", 1, step="fx")
+
+    assert first == second == (1, "fx", 1)
+    assert sg_load.calls == 1
+
+
+def test_cached_call_keys_on_arguments(clock):
+    sg_load = FakeLoad()
+
+    sgcache.cached_call(sg_load, "get_tasks", 1, step="fx")
+    sgcache.cached_call(sg_load, "get_tasks", 1, step="lighting")
+    sgcache.cached_call(sg_load, "get_tasks", 2, step="fx")
+
+    assert sg_load.calls == 3
+
+
+def test_cached_call_force_refreshes(clock):
+    sg_load = FakeLoad()
+
+    sgcache.cached_call(sg_load, "get_tasks", 1)
+    refreshed = sgcache.cached_call(sg_load, "get_tasks", 1, force=True)
+
+    assert refreshed == (1, None, 2)
+    assert sgcache.cached_call(sg_load, "get_tasks", 1) == refreshed
+    assert sg_load.calls == 2
+
+
+def test_cached_call_expires(clock):
+    sg_load = FakeLoad()
+
+    sgcache.cached_call(sg_load, "get_tasks", 1)
+    clock.now = sgcache.DEFAULT_TTL + 1
+    sgcache.cached_call(sg_load, "get_tasks", 1)
+
+    assert sg_load.calls == 2